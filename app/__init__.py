@@ -1,6 +1,7 @@
 """Flask application factory."""
 import os
 from flask import Flask
+from jinja2 import FileSystemBytecodeCache
 from .config import config
 from .extensions import db, migrate, jwt, login_manager, csrf, cors, init_supabase
 
@@ -13,6 +14,10 @@ def create_app(config_name=None):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
+    # Emit JSON keys in insertion order instead of sorting every object of
+    # every response; to_dict() already lists fields in a sensible order
+    app.json.sort_keys = False
+    
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
@@ -37,6 +42,19 @@ def create_app(config_name=None):
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(views_bp)
     
+    # Keep compiled templates on disk (per-user temp dir) so fresh workers
+    # load bytecode instead of parsing and compiling every template again.
+    # Entries are keyed by source checksum, so edited templates recompile.
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+    
+    # Badge lookups as plain dicts, e.g. {{ STATUS_COLORS.get(order.status, 'secondary') }}
+    from .utils.helpers import STATUS_COLORS, PRIORITY_COLORS, PRIORITY_LABELS
+    app.jinja_env.globals.update(
+        STATUS_COLORS=STATUS_COLORS,
+        PRIORITY_COLORS=PRIORITY_COLORS,
+        PRIORITY_LABELS=PRIORITY_LABELS,
+    )
+    
     # JWT callbacks
     from .models.user import User
     
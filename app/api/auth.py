@@ -28,11 +28,9 @@ def login():
         return api_response(message='Email/username and password required', status=400)
     
     # Find user by email or username
-    user = User.query.filter(
-        (User.email == email) | (User.username == email)
-    ).first()
+    user = User.authenticate(email, password)
     
-    if not user or not user.check_password(password):
+    if not user:
         return api_response(message='Invalid credentials', status=401)
     
     if not user.is_active:
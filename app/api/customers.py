@@ -5,6 +5,7 @@ from . import api_bp
 from ..models.customer import Customer
 from ..models.user import UserRole
 from ..extensions import db
+from ..views import invalidate_active_customers
 from ..utils.decorators import require_roles, api_response, paginate_query, log_activity
 
 
@@ -79,6 +80,7 @@ def create_customer():
     
     db.session.add(customer)
     db.session.commit()
+    invalidate_active_customers()
     
     return api_response(data=customer.to_dict(), message='Customer created successfully', status=201)
 
@@ -112,6 +114,7 @@ def update_customer(customer_id):
         customer.is_active = data['is_active']
     
     db.session.commit()
+    invalidate_active_customers()
     
     return api_response(data=customer.to_dict(), message='Customer updated successfully')
 
@@ -128,10 +131,12 @@ def delete_customer(customer_id):
     if customer.orders.count() > 0:
         customer.is_active = False
         db.session.commit()
+        invalidate_active_customers()
         return api_response(message='Customer deactivated (has existing orders)')
     
     db.session.delete(customer)
     db.session.commit()
+    invalidate_active_customers()
     
     return api_response(message='Customer deleted successfully')
 
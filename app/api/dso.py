@@ -11,6 +11,16 @@ from ..extensions import db
 from ..utils.decorators import require_roles, api_response, log_activity
 from ..services.storage_service import upload_file, delete_file
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+
+def _export_query():
+    """DSO query that loads everything the exporters read in one SELECT."""
+    return DSO.query.options(
+        joinedload(DSO.order).joinedload(Order.customer),
+        joinedload(DSO.size_chart_dewasa),
+        joinedload(DSO.size_chart_anak)
+    )
 
 
 @api_bp.route('/dso', methods=['GET'])
@@ -128,7 +138,7 @@ def export_dso_word(dso_id):
     from flask import send_file
     from ..services.word_service import export_dso_to_word
     
-    dso = DSO.query.get_or_404(dso_id)
+    dso = _export_query().get_or_404(dso_id)
     
     try:
         buffer = export_dso_to_word(dso)
@@ -148,27 +158,115 @@ def export_dso_word(dso_id):
 @login_required
 def export_dso_pdf(dso_id):
     """Export DSO to PDF document (via Word template)."""
+    import os
+    import shutil
     from flask import send_file
-    from ..services.word_service import export_dso_to_pdf
+    from ..services.word_service import export_dso_to_pdf_file
     
-    dso = DSO.query.get_or_404(dso_id)
+    dso = _export_query().get_or_404(dso_id)
     
     try:
-        buffer = export_dso_to_pdf(dso)
+        pdf_path = export_dso_to_pdf_file(dso)
         filename = f"DSO_{dso.order.order_code}_v{dso.version}.pdf"
         
-        return send_file(
-            buffer,
+        # Stream straight from the converter's output file; the temp dir
+        # is removed once the response has been sent. Werkzeug only runs
+        # call_on_close callbacks for responses that are not passed through
+        # to the server untouched, which send_file's are by default.
+        response = send_file(
+            pdf_path,
             as_attachment=True,
             download_name=filename,
             mimetype='application/pdf'
         )
+        response.direct_passthrough = False
+        response.call_on_close(
+            lambda: shutil.rmtree(os.path.dirname(pdf_path), ignore_errors=True)
+        )
+        return response
     except Exception as e:
         import traceback
         traceback.print_exc()
         return api_response(message=f'Error exporting PDF: {str(e)}', status=500)
 
 
+def _export_pdf_file(dso_id):
+    """Render a DSO to PDF for a background export job; returns (path, filename)."""
+    from ..services.word_service import export_dso_to_pdf_file
+    
+    dso = _export_query().get(dso_id)
+    if dso is None:
+        raise LookupError('DSO not found')
+    return export_dso_to_pdf_file(dso), f"DSO_{dso.order.order_code}_v{dso.version}.pdf"
+
+
+def _export_job_data(job_id, job):
+    """Status payload for an export job."""
+    from flask import url_for
+    
+    data = {'job_id': job_id, 'status': job['status'], 'error': job['error'],
+            'status_url': url_for('api.get_export_job', job_id=job_id)}
+    if job['status'] == 'done':
+        data['download_url'] = url_for('api.download_export_job', job_id=job_id)
+    return data
+
+
+@api_bp.route('/dso/<int:dso_id>/export-pdf/jobs', methods=['POST'])
+@login_required
+def start_dso_pdf_export(dso_id):
+    """Queue a PDF export off the request thread; poll status_url until done."""
+    from ..services import export_jobs
+    
+    if db.session.query(DSO.id).filter_by(id=dso_id).first() is None:
+        return api_response(message='DSO not found', status=404)
+    
+    job_id = export_jobs.submit(current_user.id, _export_pdf_file, dso_id)
+    return api_response(
+        data=_export_job_data(job_id, export_jobs.get(job_id, current_user.id)),
+        message='PDF export queued',
+        status=202
+    )
+
+
+@api_bp.route('/dso/export-jobs/<job_id>', methods=['GET'])
+@login_required
+def get_export_job(job_id):
+    """Status of a queued export; carries download_url once the file is ready."""
+    from ..services import export_jobs
+    
+    job = export_jobs.get(job_id, current_user.id)
+    if job is None:
+        return api_response(message='Export job not found', status=404)
+    return api_response(data=_export_job_data(job_id, job))
+
+
+@api_bp.route('/dso/export-jobs/<job_id>/file', methods=['GET'])
+@login_required
+def download_export_job(job_id):
+    """Send a finished export; the job and its file are dropped once read."""
+    import io
+    from flask import send_file
+    from ..services import export_jobs
+    
+    job = export_jobs.get(job_id, current_user.id)
+    if job is None:
+        return api_response(message='Export job not found', status=404)
+    if job['status'] != 'done':
+        return api_response(message='Export is not ready', status=409)
+    
+    # send_file responses skip call_on_close callbacks, so read the (small)
+    # PDF and clean up here rather than after the response is sent
+    with open(job['path'], 'rb') as f:
+        buffer = io.BytesIO(f.read())
+    export_jobs.discard(job_id)
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name=job['filename'],
+        mimetype='application/pdf'
+    )
+
+
 @api_bp.route('/dso/bulk-export', methods=['POST'])
 @login_required
 def bulk_export_dso():
@@ -176,7 +274,7 @@ def bulk_export_dso():
     import zipfile
     import io
     from flask import send_file
-    from ..services.word_service import export_dso_to_word, export_dso_to_pdf
+    from ..services.word_service import export_dso_batch
     
     data = request.get_json()
     dso_ids = data.get('dso_ids', [])
@@ -189,28 +287,25 @@ def bulk_export_dso():
         return api_response(message='Maximum 50 DSOs per bulk export', status=400)
     
     try:
+        # Fetch all requested DSOs at once, keeping the requested order
+        found = {dso.id: dso for dso in _export_query().filter(DSO.id.in_(dso_ids)).all()}
+        dsos = [found[dso_id] for dso_id in dict.fromkeys(dso_ids) if dso_id in found]
+        
+        # Documents are built concurrently; PDFs share one converter run
+        results = export_dso_batch(dsos, 'pdf' if export_format == 'pdf' else 'word')
+        ext = 'pdf' if export_format == 'pdf' else 'docx'
+        
         # Create ZIP file in memory
         zip_buffer = io.BytesIO()
         
         with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for dso_id in dso_ids:
-                dso = DSO.query.get(dso_id)
-                if not dso:
+            for dso, result in zip(dsos, results):
+                if isinstance(result, Exception):
+                    print(f"Error exporting DSO {dso.id}: {result}")
                     continue
                 
-                try:
-                    if export_format == 'pdf':
-                        doc_buffer = export_dso_to_pdf(dso)
-                        ext = 'pdf'
-                    else:
-                        doc_buffer = export_dso_to_word(dso)
-                        ext = 'docx'
-                    
-                    filename = f"DSO_{dso.order.order_code}_v{dso.version}.{ext}"
-                    zip_file.writestr(filename, doc_buffer.getvalue())
-                except Exception as e:
-                    print(f"Error exporting DSO {dso_id}: {e}")
-                    continue
+                filename = f"DSO_{dso.order.order_code}_v{dso.version}.{ext}"
+                zip_file.writestr(filename, result.getbuffer())
         
         zip_buffer.seek(0)
         
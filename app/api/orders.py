@@ -61,8 +61,22 @@ def list_orders():
         except ValueError:
             pass
     
-    query = query.order_by(Order.created_at.desc())
-    result = paginate_query(query, page, per_page)
+    query = query.order_by(Order.created_at.desc(), Order.id.desc())
+    
+    # ?cursor= switches to keyset pagination: an empty cursor is the first
+    # page, then each response's next_cursor fetches the one after it
+    if 'cursor' in request.args:
+        after = _parse_order_cursor(request.args['cursor'])
+        if after is False:
+            return api_response(message='Invalid cursor', status=400)
+        result = paginate_query(query, per_page=per_page,
+                                keyset=(Order.created_at, Order.id), after=after)
+        next_after = result['pagination'].pop('next_after')
+        result['pagination']['next_cursor'] = (
+            f"{next_after[0].isoformat()}_{next_after[1]}" if next_after else None
+        )
+    else:
+        result = paginate_query(query, page, per_page)
     
     return api_response(data={
         'orders': [o.to_dict(include_relations=True) for o in result['items']],
@@ -70,6 +84,17 @@ def list_orders():
     })
 
 
+def _parse_order_cursor(cursor):
+    """Decode a '<created_at iso>_<id>' cursor; None if empty, False if malformed."""
+    if not cursor:
+        return None
+    created_at, _, order_id = cursor.rpartition('_')
+    try:
+        return datetime.fromisoformat(created_at), int(order_id)
+    except ValueError:
+        return False
+
+
 @api_bp.route('/orders/<int:order_id>', methods=['GET'])
 @login_required
 def get_order(order_id):
@@ -63,6 +63,8 @@ class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # SQLite's in-memory pool takes no sizing options
+    SQLALCHEMY_ENGINE_OPTIONS = {}
 
 
 config = {
@@ -6,6 +6,8 @@ from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
 from flask_cors import CORS
 import os
+import threading
+import httpx
 
 # Try to import supabase, but make it optional
 try:
@@ -25,6 +27,19 @@ cors = CORS()
 
 # Supabase client (initialized later)
 supabase_client = None
+_supabase_lock = threading.Lock()
+
+# Shared HTTP client for outbound requests (e.g. fetching DSO images).
+# Keeps connections alive across requests instead of a new TCP+TLS
+# handshake per call; the pool is bounded and failed connects are retried.
+http_client = httpx.Client(
+    transport=httpx.HTTPTransport(
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40, keepalive_expiry=60.0),
+        retries=3
+    ),
+    timeout=30.0,
+    follow_redirects=True
+)
 
 
 def init_supabase():
@@ -48,10 +63,13 @@ def init_supabase():
 
 
 def get_supabase():
-    """Get Supabase client instance."""
+    """Get the process-wide Supabase client instance."""
     global supabase_client
     if not SUPABASE_AVAILABLE:
         return None
     if supabase_client is None:
-        init_supabase()
+        with _supabase_lock:
+            # Re-check: another thread may have built it while we waited
+            if supabase_client is None:
+                init_supabase()
     return supabase_client
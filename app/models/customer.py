@@ -23,6 +23,12 @@ class Customer(db.Model):
     # Relationships
     orders = db.relationship('Order', backref='customer', lazy='dynamic')
     
+    # Active customers by name (dropdowns, active-only API listing)
+    __table_args__ = (
+        db.Index('ix_customers_active_name', 'name',
+                 postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active')),
+    )
+    
     def to_dict(self):
         """Convert customer to dictionary for API response."""
         return {
@@ -19,7 +19,7 @@ class Employee(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), unique=True, nullable=True)
     employee_code = db.Column(db.String(20), unique=True, nullable=False, index=True)
-    name = db.Column(db.String(150), nullable=False)
+    name = db.Column(db.String(150), nullable=False, index=True)
     department = db.Column(db.String(100))
     position = db.Column(db.String(100))
     employment_type = db.Column(db.String(50), default='karyawan')  # karyawan, harian_lepas, borongan, magang
@@ -34,8 +34,16 @@ class Order(db.Model):
     status = db.Column(db.String(50), default='draft')
     priority = db.Column(db.Integer, default=1)  # 1=Normal, 2=High, 3=Urgent
     
+    # Sort key for the production timeline, computed by the database:
+    # in_production (1), qc_pending (2), draft (3), completed (4), others (5)
+    status_rank = db.Column(db.SmallInteger, db.Computed(
+        "CASE status WHEN 'in_production' THEN 1 WHEN 'qc_pending' THEN 2 "
+        "WHEN 'draft' THEN 3 WHEN 'completed' THEN 4 ELSE 5 END",
+        persisted=True
+    ))
+    
     # DSO Status for tracking DSO creation: not_created, draft, created
-    dso_status = db.Column(db.String(50), default='not_created')
+    dso_status = db.Column(db.String(50), default='not_created', index=True)
     
     # QC Assignment
     qc_inspector_id = db.Column(db.Integer, db.ForeignKey('employees.id'))
@@ -46,7 +54,7 @@ class Order(db.Model):
     
     # Audit
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
@@ -56,6 +64,13 @@ class Order(db.Model):
     creator = db.relationship('User', foreign_keys=[created_by])
     qc_inspector = db.relationship('Employee', foreign_keys=[qc_inspector_id])
     
+    __table_args__ = (
+        db.Index('ix_orders_status_rank_deadline', 'status_rank', 'deadline'),
+        # Newest-first lists and keyset pages, overall and per customer
+        db.Index('ix_orders_created_at_id', 'created_at', 'id'),
+        db.Index('ix_orders_customer_created_at', 'customer_id', 'created_at'),
+    )
+    
     @staticmethod
     def generate_order_code():
         """Generate unique order code."""
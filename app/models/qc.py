@@ -26,7 +26,7 @@ class QCSheet(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     # QC can be linked to either production task or order (both optional)
-    production_task_id = db.Column(db.Integer, db.ForeignKey('production_tasks.id'), nullable=True)
+    production_task_id = db.Column(db.Integer, db.ForeignKey('production_tasks.id'), nullable=True, index=True)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=True)
     
     # Inspection Details
@@ -37,6 +37,12 @@ class SOPDocument(db.Model):
     acknowledgments = db.relationship('SOPAcknowledgment', backref='sop', lazy='dynamic')
     creator = db.relationship('User', foreign_keys=[created_by])
     
+    # Active documents by title (SOP list page and API)
+    __table_args__ = (
+        db.Index('ix_sop_document_active_title', 'title',
+                 postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active')),
+    )
+    
     def get_acknowledgment_count(self):
         """Get total acknowledgment count."""
         return self.acknowledgments.count()
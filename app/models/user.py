@@ -1,6 +1,8 @@
 """User model with role-based access control."""
+import secrets
 from enum import Enum
 from datetime import datetime
+from functools import lru_cache
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from ..extensions import db
@@ -15,6 +17,12 @@ class UserRole(Enum):
     OPERATOR = 'operator'
 
 
+@lru_cache(maxsize=None)
+def _dummy_password_hash():
+    """Hash checked when a login matches no user, computed on first use."""
+    return generate_password_hash(secrets.token_hex(16))
+
+
 class User(UserMixin, db.Model):
     """User model for authentication and authorization."""
     __tablename__ = 'users'
@@ -27,7 +35,7 @@ class User(UserMixin, db.Model):
     role = db.Column(db.String(50), nullable=False, default='operator')
     is_active = db.Column(db.Boolean, default=True)
     last_login = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
@@ -85,6 +93,20 @@ class User(UserMixin, db.Model):
         """Check if the provided password matches."""
         return check_password_hash(self.password_hash, password)
     
+    @classmethod
+    def authenticate(cls, login, password):
+        """Return the user whose email or username is login if password matches.
+
+        An unknown login still pays for one password hash check, so response
+        time does not reveal which accounts exist.
+        """
+        # email and username both have unique indexes, which the OR can use
+        user = cls.query.filter((cls.email == login) | (cls.username == login)).first()
+        if user is None:
+            check_password_hash(_dummy_password_hash(), password)
+            return None
+        return user if user.check_password(password) else None
+    
     def has_role(self, *roles):
         """Check if user has any of the specified roles."""
         return self.role in roles
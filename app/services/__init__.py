@@ -1,10 +1,10 @@
 """Services package."""
-from .storage_service import upload_file, delete_file, get_public_url
+from .storage_service import upload_file, delete_file, delete_files, get_public_url, create_signed_url
 from .barcode_service import generate_barcode_image, generate_qr_code_base64
 from .pdf_service import generate_dso_pdf, generate_qc_report_pdf
 
 __all__ = [
-    'upload_file', 'delete_file', 'get_public_url',
+    'upload_file', 'delete_file', 'delete_files', 'get_public_url', 'create_signed_url',
     'generate_barcode_image', 'generate_qr_code_base64',
     'generate_dso_pdf', 'generate_qc_report_pdf'
 ]
@@ -21,6 +21,7 @@ def generate_barcode_image(barcode_value, barcode_id):
         class FileWrapper:
             def __init__(self, buffer, filename):
                 self.buffer = buffer
+                self.stream = buffer
                 self.filename = filename
                 self.content_type = 'image/png'
             
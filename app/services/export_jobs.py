@@ -0,0 +1,105 @@
+"""Background jobs for slow file exports.
+
+A DSO PDF export waits on LibreOffice for seconds; running it on the
+request thread ties up the web worker for that long. submit() hands the
+work to a small thread pool and returns a job id that the client polls
+until the file is ready to download.
+
+Jobs live in this process's memory, so status polls and the download must
+reach the process that queued the job (the default single gunicorn worker).
+Finished jobs and their files are dropped after JOB_TTL seconds.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Conversions are serialised on the LibreOffice side, so a couple of
+# threads are enough to keep the queue moving
+_EXPORT_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('EXPORT_JOB_WORKERS', 2)),
+    thread_name_prefix='export-job'
+)
+
+JOB_TTL = 600
+
+# job id -> {'status', 'user_id', 'path', 'filename', 'error', 'expires'}
+_JOBS = {}
+_JOBS_LOCK = threading.Lock()
+
+
+def _remove_file(job):
+    """Delete the temp directory holding a job's output, if any."""
+    if job.get('path'):
+        shutil.rmtree(os.path.dirname(job['path']), ignore_errors=True)
+
+
+def _purge_expired():
+    """Drop finished jobs past their TTL along with their files."""
+    now = time.monotonic()
+    with _JOBS_LOCK:
+        expired = [job_id for job_id, job in _JOBS.items()
+                   if job['expires'] is not None and job['expires'] <= now]
+        jobs = [_JOBS.pop(job_id) for job_id in expired]
+    for job in jobs:
+        _remove_file(job)
+
+
+def _run_job(app, job_id, func, args):
+    """Run an export inside a fresh app context and record its outcome."""
+    with app.app_context():
+        try:
+            path, filename = func(*args)
+            update = {'status': 'done', 'path': path, 'filename': filename}
+        except Exception as e:
+            logger.exception('Export job %s failed', job_id)
+            update = {'status': 'failed', 'error': str(e)}
+        finally:
+            db.session.remove()
+
+    update['expires'] = time.monotonic() + JOB_TTL
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+        if job is not None:
+            job.update(update)
+            return
+    # Discarded while running; nobody will fetch the file
+    _remove_file(update)
+
+
+def submit(user_id, func, *args):
+    """Queue func(*args), which returns (file path, download name); returns the job id."""
+    _purge_expired()
+    job_id = uuid.uuid4().hex
+    with _JOBS_LOCK:
+        _JOBS[job_id] = {'status': 'pending', 'user_id': user_id, 'path': None,
+                         'filename': None, 'error': None, 'expires': None}
+    _EXPORT_EXECUTOR.submit(_run_job, current_app._get_current_object(), job_id, func, args)
+    return job_id
+
+
+def get(job_id, user_id):
+    """Snapshot of a job owned by user_id, or None if unknown or expired."""
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+        if job is None or job['user_id'] != user_id:
+            return None
+        if job['expires'] is not None and job['expires'] <= time.monotonic():
+            return None
+        return dict(job)
+
+
+def discard(job_id):
+    """Forget a job and delete its file, e.g. once it has been downloaded."""
+    with _JOBS_LOCK:
+        job = _JOBS.pop(job_id, None)
+    if job is not None:
+        _remove_file(job)
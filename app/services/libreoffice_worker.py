@@ -0,0 +1,126 @@
+"""Persistent headless LibreOffice for DOCX to PDF conversion.
+
+Starting soffice costs seconds per export, so one instance is kept
+listening on a local socket and documents are converted through the UNO
+bridge. Needs LibreOffice's Python bindings (``import uno``); callers fall
+back to a one-shot ``soffice --convert-to`` run when they are missing or
+the office cannot be reached.
+"""
+import atexit
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from functools import lru_cache
+
+UNO_PORT = int(os.environ.get('LIBREOFFICE_UNO_PORT', 2002))
+CONNECT_URL = f'uno:socket,host=127.0.0.1,port={UNO_PORT};urp;StarOffice.ComponentContext'
+
+# Dedicated profile so the daemon never clashes with a desktop session
+PROFILE_DIR = os.path.join(tempfile.gettempdir(), 'dso-libreoffice-profile')
+
+_lock = threading.Lock()
+_process = None
+_desktop = None
+
+
+@lru_cache(maxsize=None)
+def available():
+    """Whether the UNO Python bindings can be imported."""
+    try:
+        import uno  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _property(name, value):
+    from com.sun.star.beans import PropertyValue
+
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+def _start_office(soffice_bin):
+    """Launch the listening soffice unless one started by us is still alive."""
+    global _process
+    import uno
+
+    if _process is not None and _process.poll() is None:
+        return
+    _process = subprocess.Popen([
+        soffice_bin,
+        '--headless',
+        '--invisible',
+        '--nologo',
+        '--norestore',
+        '--nolockcheck',
+        '--nodefault',
+        f'--accept=socket,host=127.0.0.1,port={UNO_PORT};urp;',
+        '-env:UserInstallation=' + uno.systemPathToFileUrl(PROFILE_DIR),
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _connect(soffice_bin, timeout=30):
+    """Resolve the office's Desktop, starting the office if nobody listens."""
+    global _desktop
+    import uno
+    from com.sun.star.connection import NoConnectException
+
+    local = uno.getComponentContext()
+    resolver = local.ServiceManager.createInstanceWithContext(
+        'com.sun.star.bridge.UnoUrlResolver', local)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            ctx = resolver.resolve(CONNECT_URL)
+            break
+        except NoConnectException:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"LibreOffice did not accept connections within {timeout}s")
+            _start_office(soffice_bin)
+            time.sleep(0.25)
+    _desktop = ctx.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', ctx)
+
+
+def _convert(docx_path, pdf_path):
+    import uno
+
+    doc = _desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(docx_path), '_blank', 0, (_property('Hidden', True),))
+    try:
+        doc.storeToURL(uno.systemPathToFileUrl(pdf_path),
+                       (_property('FilterName', 'writer_pdf_Export'),))
+    finally:
+        doc.close(True)
+
+
+def convert(soffice_bin, docx_path, pdf_path):
+    """Convert a .docx file to PDF on the shared LibreOffice instance.
+
+    Reconnects (restarting the office if needed) and retries once when the
+    office has gone away; raises on failure.
+    """
+    global _desktop
+    # UNO file URLs must be absolute
+    docx_path = os.path.abspath(docx_path)
+    pdf_path = os.path.abspath(pdf_path)
+    with _lock:
+        if _desktop is None:
+            _connect(soffice_bin)
+        try:
+            _convert(docx_path, pdf_path)
+        except Exception:
+            # Office may have crashed; connect to a fresh one and try again
+            _desktop = None
+            _connect(soffice_bin)
+            _convert(docx_path, pdf_path)
+
+
+@atexit.register
+def _shutdown():
+    if _process is not None and _process.poll() is None:
+        _process.terminate()
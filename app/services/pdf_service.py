@@ -3,6 +3,44 @@ import io
 from datetime import datetime
 from fpdf import FPDF
 
+# Report palette
+PRIMARY = (5, 150, 105) # #059669
+SECONDARY = (30, 41, 59) # #1e293b
+TEXT_MUTED = (100, 116, 139) # #64748b
+BG_LIGHT = (248, 250, 252) # #f8fafc
+BORDER_LIGHT = (226, 232, 240) # #e2e8f0
+
+# Grading Colors
+GRADE_COLORS = {
+    'A': (5, 150, 105), # Emerald
+    'B': (16, 185, 129), # Green
+    'C': (245, 158, 11), # Amber
+    'D': (217, 119, 6), # Orange
+    'F': (220, 38, 38)  # Red
+}
+
+# Table headers: (width, label, align)
+PROCESS_TABLE_HEADER = (
+    (50, ' Stage', 'L'),
+    (35, ' Sheets', 'C'),
+    (35, ' Inspected', 'C'),
+    (35, ' NG Rate (%)', 'C'),
+    (35, ' Pass Rate (%)', 'C'),
+)
+ISSUES_TABLE_HEADER = (
+    (80, ' Critical Parameter', 'L'),
+    (25, ' Checks', 'C'),
+    (25, ' NG Count', 'C'),
+    (30, ' Fail Rate (%)', 'C'),
+    (30, ' Trend', 'C'),
+)
+
+# DSO size-chart columns: (model attribute suffix, label)
+DSO_SIZES = (
+    ('xs', 'XS'), ('s', 'S'), ('m', 'M'), ('l', 'L'), ('xl', 'XL'),
+    ('xxl', 'XXL'), ('x3l', '3XL'), ('x4l', '4XL'), ('x5l', '5XL'),
+)
+
 
 class PremiumPDF(FPDF):
     def header(self):
@@ -23,24 +61,8 @@ def generate_qc_analytics_pdf(report_data):
         pdf.set_auto_page_break(auto=True, margin=15)
         pdf.add_page()
         
-        # Colors
-        PRIMARY = (5, 150, 105) # #059669
-        SECONDARY = (30, 41, 59) # #1e293b
-        TEXT_MUTED = (100, 116, 139) # #64748b
-        BG_LIGHT = (248, 250, 252) # #f8fafc
-        BORDER_LIGHT = (226, 232, 240) # #e2e8f0
-        
-        # Grading Colors
-        grade_colors = {
-            'A': (5, 150, 105), # Emerald
-            'B': (16, 185, 129), # Green
-            'C': (245, 158, 11), # Amber
-            'D': (217, 119, 6), # Orange
-            'F': (220, 38, 38)  # Red
-        }
-        
         grade = report_data['summary']['quality_grade']
-        grade_color = grade_colors.get(grade, (100, 116, 139))
+        grade_color = GRADE_COLORS.get(grade, (100, 116, 139))
         
         # --- HEADER ---
         pdf.set_font('helvetica', 'B', 20)
@@ -143,11 +165,8 @@ def generate_qc_analytics_pdf(report_data):
         pdf.set_fill_color(241, 245, 249)
         pdf.set_font('helvetica', 'B', 9)
         pdf.set_text_color(71, 85, 106)
-        pdf.cell(50, 8, ' Stage', border=1, fill=True)
-        pdf.cell(35, 8, ' Sheets', border=1, fill=True, align='C')
-        pdf.cell(35, 8, ' Inspected', border=1, fill=True, align='C')
-        pdf.cell(35, 8, ' NG Rate (%)', border=1, fill=True, align='C')
-        pdf.cell(35, 8, ' Pass Rate (%)', border=1, fill=True, align='C')
+        for width, label, align in PROCESS_TABLE_HEADER:
+            pdf.cell(width, 8, label, border=1, fill=True, align=align)
         pdf.ln()
         
         pdf.set_font('helvetica', '', 9)
@@ -170,11 +189,8 @@ def generate_qc_analytics_pdf(report_data):
         pdf.set_fill_color(241, 245, 249)
         pdf.set_font('helvetica', 'B', 9)
         pdf.set_text_color(71, 85, 106)
-        pdf.cell(80, 8, ' Critical Parameter', border=1, fill=True)
-        pdf.cell(25, 8, ' Checks', border=1, fill=True, align='C')
-        pdf.cell(25, 8, ' NG Count', border=1, fill=True, align='C')
-        pdf.cell(30, 8, ' Fail Rate (%)', border=1, fill=True, align='C')
-        pdf.cell(30, 8, ' Trend', border=1, fill=True, align='C')
+        for width, label, align in ISSUES_TABLE_HEADER:
+            pdf.cell(width, 8, label, border=1, fill=True, align=align)
         pdf.ln()
         
         pdf.set_font('helvetica', '', 9)
@@ -232,9 +248,156 @@ def generate_qc_analytics_pdf(report_data):
         return {'success': False, 'error': str(e), 'traceback': traceback.format_exc()}
 
 
-def generate_dso_pdf(dso):
-    """Placeholder for DSO PDF - needs conversion to fpdf2 later."""
-    return {'success': False, 'error': 'WeasyPrint not available. PDF service undergoing maintenance.'}
+def _latin1(value):
+    """Core PDF fonts only cover Latin-1; replace anything outside it."""
+    return str(value or '').encode('latin-1', 'replace').decode('latin-1')
+
+
+def _render_field_rows(pdf, rows):
+    """Draw (label, value) rows as a two-column bordered table."""
+    pdf.set_draw_color(*BORDER_LIGHT)
+    for label, value in rows:
+        pdf.set_font('helvetica', 'B', 9)
+        pdf.set_text_color(*TEXT_MUTED)
+        pdf.set_fill_color(*BG_LIGHT)
+        pdf.cell(50, 7, f' {label}', border=1, fill=True)
+        pdf.set_font('helvetica', '', 9)
+        pdf.set_text_color(*SECONDARY)
+        pdf.cell(140, 7, f' {_latin1(value)}', border=1, ln=1)
+
+
+def _render_section_title(pdf, title):
+    pdf.ln(4)
+    pdf.set_font('helvetica', 'B', 11)
+    pdf.set_text_color(*PRIMARY)
+    pdf.cell(0, 8, title, ln=1)
+
+
+def _render_sizechart(pdf, chart, title):
+    """Draw one size chart (pendek/panjang rows per size); zeros if missing."""
+    _render_section_title(pdf, title)
+    
+    pdf.set_font('helvetica', 'B', 8)
+    pdf.set_fill_color(*PRIMARY)
+    pdf.set_text_color(255, 255, 255)
+    pdf.cell(28, 7, ' Lengan', border=1, fill=True)
+    for _, label in DSO_SIZES:
+        pdf.cell(15, 7, label, border=1, align='C', fill=True)
+    pdf.cell(27, 7, 'Jumlah', border=1, align='C', fill=True, ln=1)
+    
+    pdf.set_draw_color(*BORDER_LIGHT)
+    pdf.set_text_color(*SECONDARY)
+    for prefix, label, total_attr in (('pendek', 'Pendek', 'jum_pendek'),
+                                      ('panjang', 'Panjang', 'jum_panjang')):
+        pdf.set_font('helvetica', 'B', 8)
+        pdf.cell(28, 7, f' {label}', border=1)
+        pdf.set_font('helvetica', '', 8)
+        for size, _ in DSO_SIZES:
+            value = getattr(chart, f'{prefix}_{size}') if chart else 0
+            pdf.cell(15, 7, str(value or 0), border=1, align='C')
+        pdf.set_font('helvetica', 'B', 8)
+        pdf.cell(27, 7, str(getattr(chart, total_attr) if chart else 0), border=1, align='C', ln=1)
+    
+    pdf.set_font('helvetica', 'B', 8)
+    pdf.cell(163, 7, 'TOTAL ', border=1, align='R')
+    pdf.cell(27, 7, str(chart.total if chart else 0), border=1, align='C', ln=1)
+
+
+def generate_dso_pdf(dso, image_bytes=None, qr_png=None):
+    """Generate a DSO PDF directly with fpdf2 (no DOCX/LibreOffice round-trip).
+    
+    image_bytes / qr_png are the already-fetched front image and invoice QR
+    code; either may be None.
+    """
+    try:
+        order = dso.order
+        pdf = PremiumPDF()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.add_page()
+        
+        # --- HEADER ---
+        pdf.set_font('helvetica', 'B', 20)
+        pdf.set_text_color(*PRIMARY)
+        pdf.cell(100, 10, 'GREEN PRODUCTION', ln=0)
+        
+        pdf.set_font('helvetica', 'B', 14)
+        pdf.set_text_color(*SECONDARY)
+        pdf.cell(0, 10, 'DESIGN SHEET ORDER', ln=1, align='R')
+        
+        pdf.set_font('helvetica', '', 9)
+        pdf.set_text_color(*TEXT_MUTED)
+        pdf.cell(100, 5, 'Bandung, Indonesia | High Quality Manufacturing', ln=0)
+        pdf.set_font('helvetica', 'B', 9)
+        pdf.set_text_color(*SECONDARY)
+        pdf.cell(0, 5, f"Versi {dso.version or 1}", ln=1, align='R')
+        
+        pdf.ln(3)
+        pdf.set_draw_color(*PRIMARY)
+        pdf.set_line_width(0.5)
+        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+        pdf.set_line_width(0.2)
+        pdf.ln(4)
+        
+        header_y = pdf.get_y()
+        if qr_png:
+            pdf.image(io.BytesIO(qr_png), x=175, y=header_y, w=25)
+        
+        pdf.set_font('helvetica', '', 10)
+        pdf.set_text_color(*SECONDARY)
+        for label, value in (
+            ('INV', order.order_code),
+            ('Customer', order.customer.name if order.customer else ''),
+            ('Due Date', order.deadline.strftime('%d/%m/%Y') if order.deadline else ''),
+            ('Model', order.model),
+        ):
+            pdf.set_font('helvetica', 'B', 10)
+            pdf.cell(30, 6, label)
+            pdf.set_font('helvetica', '', 10)
+            pdf.cell(130, 6, f': {_latin1(value)}', ln=1)
+        if qr_png:
+            pdf.set_y(max(pdf.get_y(), header_y + 27))
+        
+        # --- PRODUCT ---
+        _render_section_title(pdf, 'DETAIL PRODUK')
+        _render_field_rows(pdf, (
+            ('JENIS', dso.jenis), ('BAHAN', dso.bahan), ('WARNA', dso.warna),
+            ('SABLON', dso.sablon), ('POSISI', dso.posisi),
+        ))
+        
+        _render_section_title(pdf, 'AKSESORIS')
+        _render_field_rows(pdf, (
+            ('ACC 1', dso.acc_1), ('ACC 2', dso.acc_2), ('ACC 3', dso.acc_3),
+            ('ACC 4', dso.acc_4), ('ACC 5', dso.acc_5), ('KANCING', dso.kancing),
+            ('SAKU', dso.saku), ('RESLETING', dso.resleting),
+            ('MODEL BADAN BAWAH', dso.model_badan_bawah),
+        ))
+        
+        # --- IMAGE ---
+        if image_bytes:
+            _render_section_title(pdf, 'TAMPAK DEPAN')
+            try:
+                pdf.image(io.BytesIO(image_bytes), x=55, w=100)
+            except Exception:
+                pdf.set_font('helvetica', 'I', 9)
+                pdf.set_text_color(*TEXT_MUTED)
+                pdf.cell(0, 7, '(Gambar tidak tersedia)', ln=1)
+        
+        # --- SIZE CHARTS ---
+        _render_sizechart(pdf, dso.size_chart_dewasa, 'SIZE CHART DEWASA')
+        _render_sizechart(pdf, dso.size_chart_anak, 'SIZE CHART ANAK')
+        
+        # --- NOTES ---
+        _render_section_title(pdf, 'CATATAN CUSTOMER')
+        _render_field_rows(pdf, [
+            (str(i), getattr(dso, f'catatan_customer_{i}')) for i in range(1, 7)
+        ] + [('LABEL', dso.label)])
+        
+        output = pdf.output()
+        return {'success': True, 'pdf': output}
+        
+    except Exception as e:
+        import traceback
+        return {'success': False, 'error': str(e), 'traceback': traceback.format_exc()}
 
 
 def generate_qc_report_pdf(qc_sheet):
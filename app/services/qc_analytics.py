@@ -5,11 +5,139 @@ Optimized for PostgreSQL JSONB performance.
 """
 
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import calendar
-from sqlalchemy import func, text, case
+from flask import current_app
+from sqlalchemy import func, text, case, select
 from ..extensions import db
 from ..models import QCSheet, DefectLog, ProductionTask, Order, QCResult
 
+# Shared pool for running independent report queries concurrently.
+# Each job gets its own app context (and therefore its own DB session).
+_REPORT_EXECUTOR = ThreadPoolExecutor(max_workers=6, thread_name_prefix='qc-report')
+
+
+# Raw SQL for the JSON checklist aggregations. Built once at import so
+# SQLAlchemy can reuse the compiled statement from its cache on every call.
+_PARAMETER_TRENDS_SQL = text("""
+    SELECT 
+        TO_CHAR(qs.created_at, 'IW') as week_num,
+        COALESCE(elem->>'parameter', elem->>'name') as param_name,
+        SUM(CAST(COALESCE(elem->>'qty_checked', '0') AS INTEGER)) as checked,
+        SUM(CAST(COALESCE(elem->>'qty_ng', '0') AS INTEGER)) as ng
+    FROM qc_sheet qs
+    CROSS JOIN LATERAL json_array_elements(
+        CASE WHEN json_typeof(qs.checklist_json) = 'array' THEN qs.checklist_json END
+    ) elem
+    WHERE qs.created_at >= :start_date
+    GROUP BY week_num, param_name
+    ORDER BY week_num ASC
+""")
+
+_NG_TOTALS_SQL = text("""
+    SELECT 
+        SUM(CAST(COALESCE(elem->>'qty_checked', '0') AS INTEGER)) as total_checked,
+        SUM(CAST(COALESCE(elem->>'qty_ng', '0') AS INTEGER)) as total_ng
+    FROM qc_sheet qs
+    CROSS JOIN LATERAL json_array_elements(
+        CASE WHEN json_typeof(qs.checklist_json) = 'array' THEN qs.checklist_json END
+    ) elem
+    WHERE qs.created_at >= :start_date
+      AND qs.created_at <= :end_date
+""")
+
+_PROCESS_PARAM_SQL = text("""
+    SELECT 
+        pt.process,
+        SUM(CAST(COALESCE(elem->>'qty_checked', '0') AS INTEGER)) as total_checked,
+        SUM(CAST(COALESCE(elem->>'qty_ng', '0') AS INTEGER)) as total_ng
+    FROM qc_sheet qs
+    JOIN production_tasks pt ON qs.production_task_id = pt.id
+    CROSS JOIN LATERAL json_array_elements(
+        CASE WHEN json_typeof(qs.checklist_json) = 'array' THEN qs.checklist_json END
+    ) elem
+    WHERE qs.created_at >= :start_date
+    GROUP BY pt.process
+""")
+
+_CHECKLIST_ANALYSIS_SQL = text("""
+    WITH agg AS (
+        SELECT 
+            pt.process,
+            COALESCE(elem->>'parameter', elem->>'name') as param_name,
+            SUM(CAST(COALESCE(elem->>'qty_checked', '0') AS INTEGER)) as total_checked,
+            SUM(CAST(COALESCE(elem->>'qty_ng', '0') AS INTEGER)) as total_ng,
+            COUNT(*) as sample_count,
+            SUM(CASE WHEN elem->>'status' = 'pass' THEN 1 ELSE 0 END) as pass_count,
+            SUM(CASE WHEN elem->>'status' = 'fail' THEN 1 ELSE 0 END) as fail_count
+        FROM qc_sheet qs
+        JOIN production_tasks pt ON qs.production_task_id = pt.id
+        CROSS JOIN LATERAL json_array_elements(
+            CASE WHEN json_typeof(qs.checklist_json) = 'array' THEN qs.checklist_json END
+        ) elem
+        WHERE qs.created_at >= :start_date
+        GROUP BY pt.process, param_name
+    ),
+    rated AS (
+        SELECT agg.*,
+               ROUND(total_ng * 100.0 / NULLIF(total_checked, 0), 2) as ng_rate
+        FROM agg
+        WHERE total_checked > 0
+    ),
+    top AS (
+        SELECT 
+            process, param_name, total_checked, total_ng,
+            sample_count, pass_count, fail_count, ng_rate,
+            CASE WHEN ng_rate > 2.5 THEN 'critical'
+                 WHEN ng_rate > 1 THEN 'warning'
+                 ELSE 'good' END as status,
+            COUNT(*) OVER () as total_params
+        FROM rated
+        ORDER BY ng_rate DESC NULLS LAST
+        LIMIT :limit
+    ),
+    sheets AS (
+        SELECT COUNT(*) as total_sheets
+        FROM qc_sheet
+        WHERE created_at >= :start_date
+          AND checklist_json IS NOT NULL
+    )
+    -- LEFT JOIN keeps the sheet count even when no parameter rows match
+    SELECT top.*, sheets.total_sheets
+    FROM sheets
+    LEFT JOIN top ON true
+    ORDER BY top.ng_rate DESC NULLS LAST
+""")
+
+
+def _bucket_now(seconds=300):
+    """
+    Current time rounded down to a fixed bucket (default 5 minutes).
+    Concurrent dashboard loads in the same bucket then send identical
+    query parameters, so plan and result caches can be shared.
+    Stays naive, like the other datetimes in this module, so comparisons
+    against the timestamp columns behave as before.
+    """
+    now = datetime.now()
+    return now - timedelta(
+        seconds=(now.minute * 60 + now.second) % seconds,
+        microseconds=now.microsecond
+    )
+
+
+def _run_in_app_context(app, func, *args):
+    """Run an analytics call inside a fresh app context on a worker thread."""
+    with app.app_context():
+        try:
+            return func(*args)
+        finally:
+            db.session.remove()
+
+
+def _submit_report(app, func, *args):
+    """Queue an analytics call on the report pool; returns its Future."""
+    return _REPORT_EXECUTOR.submit(_run_in_app_context, app, func, *args)
+
 
 class QCAnalyticsService:
     """Service for QC data analytics and reporting."""
@@ -21,6 +149,13 @@ class QCAnalyticsService:
         'resolution_rate': 0.2,  # 20% weight for defect resolution
         'consistency': 0.1       # 10% weight for consistency
     }
+    # Same weights as a tuple, in (pass, ng, resolution, consistency) order
+    _WEIGHTS_T = (
+        WEIGHTS['pass_rate'],
+        WEIGHTS['ng_rate'],
+        WEIGHTS['resolution_rate'],
+        WEIGHTS['consistency']
+    )
     
     @staticmethod
     def calculate_fpy(start_date=None, end_date=None):
@@ -29,7 +164,7 @@ class QCAnalyticsService:
         FPY = (Units passing QC on first attempt / Total units inspected) * 100
         """
         if not end_date:
-            end_date = datetime.now()
+            end_date = _bucket_now()
         if not start_date:
             start_date = end_date - timedelta(days=30)
             
@@ -75,26 +210,18 @@ class QCAnalyticsService:
         Returns weekly breakdown of NG rates per parameter.
         Optimized with SQL.
         """
-        end_date = datetime.now()
+        end_date = _bucket_now()
         start_date = end_date - timedelta(days=days)
         
         # SQL Query to unnest JSON and aggregate by week and parameter
         # Note: We cast to proper types to avoid errors
-        sql = text("""
-            SELECT 
-                TO_CHAR(qs.created_at, 'IW') as week_num,
-                COALESCE(elem->>'parameter', elem->>'name') as param_name,
-                SUM(CAST(COALESCE(elem->>'qty_checked', '0') AS INTEGER)) as checked,
-                SUM(CAST(COALESCE(elem->>'qty_ng', '0') AS INTEGER)) as ng
-            FROM qc_sheet qs, 
-                 json_array_elements(qs.checklist_json) elem 
-            WHERE qs.created_at >= :start_date 
-              AND qs.checklist_json IS NOT NULL
-            GROUP BY week_num, param_name
-            ORDER BY week_num ASC
-        """)
-        
-        results = db.session.execute(sql, {'start_date': start_date}).fetchall()
+        # Stream rows with a server-side cursor instead of materializing the
+        # whole (week, param) result set; the loop below aggregates incrementally.
+        results = db.session.execute(
+            _PARAMETER_TRENDS_SQL,
+            {'start_date': start_date},
+            execution_options={'stream_results': True, 'yield_per': 500}
+        )
         
         # Process results in Python (much smaller dataset now)
         weekly_data = {}
@@ -172,7 +299,7 @@ class QCAnalyticsService:
         Optimized to reduce DB calls.
         """
         if not end_date:
-            end_date = datetime.now()
+            end_date = _bucket_now()
         if not start_date:
             start_date = end_date - timedelta(days=30)
         
@@ -181,18 +308,7 @@ class QCAnalyticsService:
         fpy_score = fpy_data['fpy_percentage']
         
         # 2. Calculate NG rate using SQL
-        sql = text("""
-            SELECT 
-                SUM(CAST(COALESCE(elem->>'qty_checked', '0') AS INTEGER)) as total_checked,
-                SUM(CAST(COALESCE(elem->>'qty_ng', '0') AS INTEGER)) as total_ng
-            FROM qc_sheet qs,
-                 json_array_elements(qs.checklist_json) elem
-            WHERE qs.created_at >= :start_date 
-              AND qs.created_at <= :end_date
-              AND qs.checklist_json IS NOT NULL
-        """)
-        
-        result = db.session.execute(sql, {
+        result = db.session.execute(_NG_TOTALS_SQL, {
             'start_date': start_date, 
             'end_date': end_date
         }).first()
@@ -228,12 +344,12 @@ class QCAnalyticsService:
         consistency_score = 85 
         
         # Weighted final score
-        weights = QCAnalyticsService.WEIGHTS
+        w_pass, w_ng, w_res, w_cons = QCAnalyticsService._WEIGHTS_T
         quality_score = round(
-            (fpy_score * weights['pass_rate']) +
-            (ng_score * weights['ng_rate']) +
-            (resolution_score * weights['resolution_rate']) +
-            (consistency_score * weights['consistency']),
+            (fpy_score * w_pass) +
+            (ng_score * w_ng) +
+            (resolution_score * w_res) +
+            (consistency_score * w_cons),
             1
         )
         
@@ -264,7 +380,7 @@ class QCAnalyticsService:
                 'resolution_score': round(resolution_score, 1),
                 'consistency_score': round(consistency_score, 1)
             },
-            'weights': weights,
+            'weights': QCAnalyticsService.WEIGHTS,
             'period_start': start_date.isoformat(),
             'period_end': end_date.isoformat()
         }
@@ -275,7 +391,7 @@ class QCAnalyticsService:
         Compare quality metrics across process stages.
         Optimized with SQL aggregation.
         """
-        end_date = datetime.now()
+        end_date = _bucket_now()
         start_date = end_date - timedelta(days=days)
         
         # We need to aggregate at two levels:
@@ -283,60 +399,42 @@ class QCAnalyticsService:
         # 2. Parameter level (Total checked/NG from JSON)
         
         # 1. Sheet Stats per Process
-        sheet_stats = db.session.query(
-            ProductionTask.process,
+        # Core select: rows are plain mappings, no ORM entity/identity-map work
+        sheet_stats_stmt = select(
+            ProductionTask.process.label('process'),
             func.count(QCSheet.id).label('total_sheets'),
             func.sum(QCSheet.qty_inspected).label('total_inspected'),
             func.sum(QCSheet.qty_passed).label('total_passed'),
             func.sum(QCSheet.qty_failed).label('total_failed'),
             func.sum(case((QCSheet.result.in_([QCResult.PASS, QCResult.CONDITIONAL_PASS]), 1), else_=0)).label('pass_count'),
             func.sum(case((QCSheet.result == QCResult.FAIL, 1), else_=0)).label('fail_count')
-        ).join(
+        ).select_from(QCSheet).join(
             ProductionTask, QCSheet.production_task_id == ProductionTask.id
-        ).filter(
+        ).where(
             QCSheet.created_at >= start_date
         ).group_by(
             ProductionTask.process
-        ).all()
+        )
+        sheet_stats = db.session.execute(sheet_stats_stmt).mappings().all()
         
         # 2. Parameter Stats per Process (using SQL for JSON)
-        param_sql = text("""
-            SELECT 
-                pt.process,
-                SUM(CAST(COALESCE(elem->>'qty_checked', '0') AS INTEGER)) as total_checked,
-                SUM(CAST(COALESCE(elem->>'qty_ng', '0') AS INTEGER)) as total_ng
-            FROM qc_sheet qs
-            JOIN production_tasks pt ON qs.production_task_id = pt.id
-            CROSS JOIN json_array_elements(qs.checklist_json) elem
-            WHERE qs.created_at >= :start_date
-              AND qs.checklist_json IS NOT NULL
-            GROUP BY pt.process
-        """)
-        
-        param_stats_res = db.session.execute(param_sql, {'start_date': start_date}).fetchall()
-        param_map = {str(row[0]): {'checked': row[1], 'ng': row[2]} for row in param_stats_res}
-        if not param_map:
-            # handle case where row[0] is enum in python but string in sql or vice-versa
-            # try mapping both ways if needed, but string key should support most
-            pass
+        # production_tasks.process is a plain string column, so both queries
+        # key on the same string value.
+        param_stats_res = db.session.execute(_PROCESS_PARAM_SQL, {'start_date': start_date}).fetchall()
+        param_map = {row[0]: {'checked': row[1], 'ng': row[2]} for row in param_stats_res}
 
         comparison = []
         for stat in sheet_stats:
-            stage_val = stat.process.value if hasattr(stat.process, 'value') else str(stat.process)
-            
-            # Get param stats
+            stage_val = stat['process']
             p_stat = param_map.get(stage_val, {'checked': 0, 'ng': 0})
-            if p_stat['checked'] == 0 and stage_val not in param_map:
-                 # fallback check raw value
-                 p_stat = param_map.get(str(stat.process), {'checked': 0, 'ng': 0})
-                 
+            
             total_checked = p_stat['checked'] or 0
             total_ng = p_stat['ng'] or 0
             
-            total_inspected = int(stat.total_inspected or 0)
-            total_passed = int(stat.total_passed or 0)
-            pass_count = int(stat.pass_count or 0)
-            total_sheets = int(stat.total_sheets or 0)
+            total_inspected = int(stat['total_inspected'] or 0)
+            total_passed = int(stat['total_passed'] or 0)
+            pass_count = int(stat['pass_count'] or 0)
+            total_sheets = int(stat['total_sheets'] or 0)
             
             pass_rate = round((total_passed / total_inspected * 100), 1) if total_inspected > 0 else 0
             ng_rate = round((total_ng / total_checked * 100), 2) if total_checked > 0 else 0
@@ -374,7 +472,7 @@ class QCAnalyticsService:
         """
         Generate exportable summary report data.
         """
-        end_date = datetime.now()
+        end_date = _bucket_now()
         
         if period == 'week':
             start_date = end_date - timedelta(days=7)
@@ -389,19 +487,33 @@ class QCAnalyticsService:
             prev_start = start_date - timedelta(days=7)
             prev_end = start_date
         
+        days = 7 if period == 'week' else 30
+        
+        # The period queries are independent, so run them concurrently
+        # on separate pooled connections instead of one after another.
+        app = current_app._get_current_object()
+        
         # Current period
-        current_fpy = QCAnalyticsService.calculate_fpy(start_date, end_date)
-        current_score = QCAnalyticsService.calculate_quality_score(start_date, end_date)
-        current_process = QCAnalyticsService.get_process_comparison(7 if period == 'week' else 30)
+        current_fpy_f = _submit_report(app, QCAnalyticsService.calculate_fpy, start_date, end_date)
+        current_score_f = _submit_report(app, QCAnalyticsService.calculate_quality_score, start_date, end_date)
+        current_process_f = _submit_report(app, QCAnalyticsService.get_process_comparison, days)
         
         # Previous period
-        prev_fpy = QCAnalyticsService.calculate_fpy(prev_start, prev_end)
-        prev_score = QCAnalyticsService.calculate_quality_score(prev_start, prev_end)
+        prev_fpy_f = _submit_report(app, QCAnalyticsService.calculate_fpy, prev_start, prev_end)
+        prev_score_f = _submit_report(app, QCAnalyticsService.calculate_quality_score, prev_start, prev_end)
+        
+        trends_f = _submit_report(app, QCAnalyticsService.get_parameter_trends, days)
+        
+        current_fpy = current_fpy_f.result()
+        current_score = current_score_f.result()
+        current_process = current_process_f.result()
+        prev_fpy = prev_fpy_f.result()
+        prev_score = prev_score_f.result()
+        trends = trends_f.result()
         
         fpy_change = round(current_fpy['fpy_percentage'] - prev_fpy['fpy_percentage'], 2)
         score_change = round(current_score['quality_score'] - prev_score['quality_score'], 1)
         
-        trends = QCAnalyticsService.get_parameter_trends(7 if period == 'week' else 30)
         top_issues = trends['parameter_trends'][:5]
         
         # Optimized defect counts
@@ -448,79 +560,46 @@ class QCAnalyticsService:
         Deep analysis of checklist parameters with statistical insights.
         Optimized with SQL Aggregation.
         """
-        end_date = datetime.now()
+        end_date = _bucket_now()
         start_date = end_date - timedelta(days=days)
         
-        # SQL for primary aggregation
-        sql = text("""
-            SELECT 
-                pt.process,
-                COALESCE(elem->>'parameter', elem->>'name') as param_name,
-                SUM(CAST(COALESCE(elem->>'qty_checked', '0') AS INTEGER)) as total_checked,
-                SUM(CAST(COALESCE(elem->>'qty_ng', '0') AS INTEGER)) as total_ng,
-                COUNT(*) as sample_count,
-                SUM(CASE WHEN elem->>'status' = 'pass' THEN 1 ELSE 0 END) as pass_count,
-                SUM(CASE WHEN elem->>'status' = 'fail' THEN 1 ELSE 0 END) as fail_count
-            FROM qc_sheet qs
-            JOIN production_tasks pt ON qs.production_task_id = pt.id
-            CROSS JOIN json_array_elements(qs.checklist_json) elem
-            WHERE qs.created_at >= :start_date
-              AND qs.checklist_json IS NOT NULL
-            GROUP BY pt.process, param_name
-        """)
-        
-        results = db.session.execute(sql, {'start_date': start_date}).fetchall()
+        # SQL does the aggregation, status and top-N selection; Python only
+        # sees the rows it returns.
+        results = db.session.execute(_CHECKLIST_ANALYSIS_SQL, {
+            'start_date': start_date,
+            'limit': 20
+        }).fetchall()
+        
+        # Every row carries the sheet count; a lone all-NULL row means no parameters
+        total_sheets = int(results[0].total_sheets) if results else 0
+        total_parameters = int(results[0].total_params or 0) if results else 0
         
         analysis = []
         for row in results:
+            if row.total_checked is None:
+                continue
+            
             # We skip variance calculation for now to keep SQL simple, 
             # or we could do it in SQL but it requires unnesting arrays of values which is complex.
             # We'll set std_dev to 0 for now as it was mostly for show.
             
-            stage = row[0]
+            stage = row.process
             # Handle Enum if it comes back as Enum object (unlikely in raw sql, but possible depending on driver)
             if hasattr(stage, 'value'):
                 stage = stage.value
                 
-            param_name = str(row[1]) if row[1] is not None else 'Unknown'
-            total_checked = row[2] or 0
-            total_ng = row[3] or 0
-            sample_count = row[4]
-            pass_count = row[5]
-            fail_count = row[6]
-            
-            if total_checked == 0:
-                continue
-                
-            ng_rate = round((total_ng / total_checked) * 100, 2)
-            
-            if ng_rate > 2.5:
-                status = 'critical'
-            elif ng_rate > 1:
-                status = 'warning'
-            else:
-                status = 'good'
-                
             analysis.append({
                 'stage': stage,
-                'parameter': param_name,
-                'total_checked': total_checked,
-                'total_ng': total_ng,
-                'ng_rate': ng_rate,
+                'parameter': str(row.param_name) if row.param_name is not None else 'Unknown',
+                'total_checked': row.total_checked,
+                'total_ng': row.total_ng or 0,
+                'ng_rate': float(row.ng_rate),
                 'std_dev': 0, 
-                'sample_count': sample_count,
-                'pass_count': pass_count,
-                'fail_count': fail_count,
-                'status': status
+                'sample_count': row.sample_count,
+                'pass_count': row.pass_count,
+                'fail_count': row.fail_count,
+                'status': row.status
             })
-            
-        analysis.sort(key=lambda x: x['ng_rate'], reverse=True)
-        
-        # Total sheets count need separate query
-        total_sheets = QCSheet.query.filter(
-            QCSheet.created_at >= start_date,
-            QCSheet.checklist_json != None
-        ).count()
         
         # Group by stage
         by_stage = {}
@@ -531,9 +610,9 @@ class QCAnalyticsService:
             by_stage[stage_name].append(item)
             
         return {
-            'total_parameters_analyzed': len(analysis),
+            'total_parameters_analyzed': total_parameters,
             'total_sheets_analyzed': total_sheets,
-            'parameters': analysis[:20],
+            'parameters': analysis,
             'by_stage': by_stage,
             'period_days': days
         }
@@ -543,7 +622,7 @@ class QCAnalyticsService:
         """
         Get Pareto analysis data for defect types.
         """
-        end_date = datetime.now()
+        end_date = _bucket_now()
         start_date = end_date - timedelta(days=days)
         
         # Optimized: DB does aggregation and ordering
@@ -586,7 +665,7 @@ class QCAnalyticsService:
         Get defect rate trends (weekly or monthly).
         Returns aggregated data points and analytics.
         """
-        end_date = datetime.now()
+        end_date = _bucket_now()
         data_points = []
         
         # Generate time buckets
@@ -1,25 +1,43 @@
 """Supabase Storage service."""
 import os
-import uuid
-from datetime import datetime
-from werkzeug.utils import secure_filename
+import secrets
+import shutil
+import time
+from functools import lru_cache
 from ..extensions import get_supabase
 
 BUCKET_NAME = 'erp-files'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx'})
+
+# Leading bytes expected for each allowed extension
+FILE_SIGNATURES = {
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'jpg': (b'\xff\xd8\xff',),
+    'jpeg': (b'\xff\xd8\xff',),
+    'gif': (b'GIF87a', b'GIF89a'),
+    'pdf': (b'%PDF-',),
+    'doc': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',),  # OLE2 compound file
+    'docx': (b'PK\x03\x04',),  # ZIP container
+}
 
 
 def allowed_file(filename):
     """Check if file extension is allowed."""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return os.path.splitext(filename)[1][1:].lower() in ALLOWED_EXTENSIONS
+
+
+def content_matches_extension(stream, filename):
+    """Check the file's leading bytes against its extension, then rewind."""
+    header = stream.read(16)
+    stream.seek(0)
+    ext = os.path.splitext(filename)[1][1:].lower()
+    return header.startswith(FILE_SIGNATURES.get(ext, ()))
 
 
 def generate_unique_filename(original_filename):
     """Generate unique filename."""
-    ext = original_filename.rsplit('.', 1)[1].lower() if '.' in original_filename else ''
-    unique_id = uuid.uuid4().hex[:8]
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-    return f"{timestamp}_{unique_id}.{ext}"
+    ext = os.path.splitext(original_filename)[1][1:].lower()
+    return f"{time.time_ns():x}_{secrets.token_hex(4)}.{ext}"
 
 
 def upload_file(file, folder='uploads'):
@@ -34,24 +52,31 @@ def upload_file(file, folder='uploads'):
         filename = generate_unique_filename(file.filename)
         file_path = f"{folder}/{filename}"
         
-        # Read file content
-        file_content = file.read()
+        # Werkzeug FileStorage exposes the spooled upload as .stream;
+        # simple wrappers (e.g. barcode_service) are file-like themselves.
+        stream = getattr(file, 'stream', file)
+        
+        # Reject renamed files before anything is written or sent
+        if not content_matches_extension(stream, file.filename):
+            return {'success': False, 'error': 'File content does not match its type'}
         
         supabase = get_supabase()
         if not supabase:
-            # Fallback: save locally
+            # Fallback: save locally, copying in 1 MB chunks instead of
+            # buffering the whole upload in memory
             local_path = os.path.join('app', 'static', 'uploads', folder)
             os.makedirs(local_path, exist_ok=True)
             full_path = os.path.join(local_path, filename)
             with open(full_path, 'wb') as f:
-                f.write(file_content)
+                shutil.copyfileobj(stream, f, length=1024 * 1024)
             return {
                 'success': True,
                 'url': f'/static/uploads/{folder}/{filename}',
                 'path': file_path
             }
         
-        # Upload to Supabase
+        # Upload to Supabase (bounded by MAX_CONTENT_LENGTH)
+        file_content = stream.read()
         response = supabase.storage.from_(BUCKET_NAME).upload(
             file_path,
             file_content,
@@ -71,24 +96,40 @@ def upload_file(file, folder='uploads'):
         return {'success': False, 'error': str(e)}
 
 
-def delete_file(file_path):
-    """Delete file from Supabase Storage."""
+def _strip_url(file_path):
+    """Extract the storage path from a full public URL."""
+    if file_path.startswith('http'):
+        return file_path.split(f'{BUCKET_NAME}/')[-1]
+    return file_path
+
+
+def delete_files(file_paths):
+    """Delete several files from Supabase Storage in a single request."""
     try:
         supabase = get_supabase()
         if not supabase:
             return {'success': False, 'error': 'Supabase not configured'}
         
-        # Extract path from URL if full URL provided
-        if file_path.startswith('http'):
-            file_path = file_path.split(f'{BUCKET_NAME}/')[-1]
-        
-        supabase.storage.from_(BUCKET_NAME).remove([file_path])
+        paths = [_strip_url(p) for p in file_paths if p]
+        if paths:
+            supabase.storage.from_(BUCKET_NAME).remove(paths)
         return {'success': True}
         
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
+def delete_file(file_path):
+    """Delete file from Supabase Storage."""
+    return delete_files([file_path])
+
+
+@lru_cache(maxsize=4096)
+def _cached_public_url(file_path):
+    """Build a public URL once per path; public URLs are deterministic."""
+    return get_supabase().storage.from_(BUCKET_NAME).get_public_url(file_path)
+
+
 def get_public_url(file_path):
     """Get public URL for a file."""
     try:
@@ -96,7 +137,7 @@ def get_public_url(file_path):
         if not supabase:
             return None
         
-        return supabase.storage.from_(BUCKET_NAME).get_public_url(file_path)
+        return _cached_public_url(file_path)
     except Exception:
         return None
 
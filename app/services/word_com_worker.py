@@ -0,0 +1,89 @@
+"""Persistent Word COM worker for DOCX to PDF conversion (Windows only).
+
+Starting Word.Application costs seconds, so one instance is kept alive on a
+dedicated thread and conversion jobs are fed to it through a queue.
+"""
+import os
+import queue
+import threading
+
+# WdSaveFormat.wdFormatPDF
+WD_FORMAT_PDF = 17
+
+_jobs = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _quit_word(word):
+    """Close a Word instance, ignoring errors from an already-dead server."""
+    try:
+        word.Quit()
+    except Exception:
+        pass
+
+
+def _run():
+    """Worker loop: own a single Word instance and convert queued documents."""
+    import pythoncom
+    import win32com.client
+
+    pythoncom.CoInitialize()
+    word = None
+    try:
+        while True:
+            docx_path, pdf_path, job = _jobs.get()
+            try:
+                if word is None:
+                    word = win32com.client.DispatchEx('Word.Application')
+                    word.Visible = False
+                    word.DisplayAlerts = 0
+                doc = word.Documents.Open(docx_path, ReadOnly=True)
+                try:
+                    doc.SaveAs(pdf_path, FileFormat=WD_FORMAT_PDF)
+                finally:
+                    doc.Close(False)
+            except Exception as e:
+                job['error'] = e
+                # Word may have crashed; start a fresh instance on the next job
+                if word is not None:
+                    _quit_word(word)
+                word = None
+            finally:
+                job['done'].set()
+    finally:
+        if word is not None:
+            _quit_word(word)
+        pythoncom.CoUninitialize()
+
+
+def _ensure_worker():
+    """Start the worker thread on first use; raises ImportError without pywin32."""
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                # Check here: an ImportError inside the thread would leave
+                # callers waiting for a job that never runs
+                try:
+                    import pythoncom  # noqa: F401
+                    import win32com.client  # noqa: F401
+                except ImportError as e:
+                    raise ImportError(f"Word PDF conversion requires pywin32. Error: {e}")
+                _worker = threading.Thread(target=_run, name='word-com-worker', daemon=True)
+                _worker.start()
+
+
+def convert(docx_path, pdf_path, timeout=120):
+    """Convert a .docx file to PDF using the shared Word instance.
+
+    Blocks until the job finishes; raises the worker's exception on failure.
+    """
+    _ensure_worker()
+    job = {'done': threading.Event(), 'error': None}
+    # Word resolves relative paths against its own working directory
+    _jobs.put((os.path.abspath(docx_path), os.path.abspath(pdf_path), job))
+    if not job['done'].wait(timeout):
+        raise TimeoutError(f"Word PDF conversion timed out after {timeout}s")
+    if job['error'] is not None:
+        raise job['error']
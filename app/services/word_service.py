@@ -1,11 +1,487 @@
 """Service for exporting DSO to Word document."""
 import os
 import io
+import logging
+import copy
+import re
+import platform
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import accumulate
+import httpx
+from PIL import Image
 from docx import Document
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-import requests
+from docx.image.exceptions import (
+    InvalidImageStreamError, UnexpectedEndOfFileError, UnrecognizedImageError
+)
+from docx.opc.part import Part
+from docx.oxml.ns import qn
+from docx.table import _Cell
+from docx.text.paragraph import Paragraph
+from docx.text.run import Run
+from . import libreoffice_worker
 from .barcode_service import generate_qr_code
+from ..extensions import http_client
+
+logger = logging.getLogger(__name__)
+
+# Matches any {{...}} placeholder; the replacement is looked up per match,
+# so each run is scanned once instead of once per key.
+PLACEHOLDER_RE = re.compile(r'\{\{[^{}]+\}\}')
+
+# Characters python-docx turns into w:tab / w:br elements inside a run
+RUN_BREAK_RE = re.compile(r'[\t\r\n]')
+XML_SPACE = qn('xml:space')
+
+# Local upload fallback serves files from here under /static/
+STATIC_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'static'))
+
+# DSO templates, resolved once at import
+TEMPLATE_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'template_docs'))
+WORD_TEMPLATE_PATH = os.path.join(TEMPLATE_DIR, 'dsotemplates.docx')
+LIBRE_TEMPLATE_PATH = os.path.join(TEMPLATE_DIR, 'dsotemplates_libre.docx')
+if not os.path.exists(LIBRE_TEMPLATE_PATH):
+    # Fallback to original template if libre version doesn't exist
+    LIBRE_TEMPLATE_PATH = WORD_TEMPLATE_PATH
+
+# PDF backend inputs; neither changes at runtime, so resolve them once
+IS_WINDOWS = platform.system() == 'Windows'
+
+
+def _find_libreoffice():
+    """Locate the LibreOffice binary; None if it is not installed."""
+    for name in ('libreoffice', 'soffice'):
+        path = shutil.which(name)
+        if path:
+            return path
+    if IS_WINDOWS:
+        for base in (os.environ.get('PROGRAMFILES'), os.environ.get('PROGRAMFILES(X86)')):
+            if base:
+                path = os.path.join(base, 'LibreOffice', 'program', 'soffice.exe')
+                if os.path.exists(path):
+                    return path
+    return None
+
+
+LIBREOFFICE_BIN = _find_libreoffice()
+
+
+def _patch_pywin32_path():
+    """Fix for pywin32 DLL load error (pywintypes314.dll not found)."""
+    import site
+    import sys
+    try:
+        paths_to_check = sys.path + site.getsitepackages()
+        for path in paths_to_check:
+            dll_path = os.path.join(path, 'pywin32_system32')
+            if os.path.exists(dll_path):
+                # Python 3.8+ no longer searches PATH for extension module
+                # DLLs; keep PATH too for anything that still does
+                os.add_dll_directory(dll_path)
+                os.environ['PATH'] = dll_path + os.pathsep + os.environ['PATH']
+                break
+    except Exception as e:
+        logger.warning("Could not patch PATH for pywin32: %s", e)
+
+
+# One-time setup for the Word COM fallback, not a per-export cost
+if IS_WINDOWS:
+    _patch_pywin32_path()
+
+# Headless batch conversion: no splash, no crash-recovery or lock-file
+# checks, no empty start document, and the Writer PDF filter named up front
+LIBREOFFICE_ARGS = (
+    '--headless', '--nologo', '--norestore', '--nolockcheck', '--nodefault',
+    '--convert-to', 'pdf:writer_pdf_Export',
+)
+
+# Scratch directory for DOCX->PDF conversion files. Point FAST_TMP at a
+# memory-backed location (/dev/shm on Linux, a RAM disk on Windows) to keep
+# the conversion round-trip off the physical disk.
+FAST_TMP_DIR = os.environ.get('FAST_TMP', tempfile.gettempdir())
+
+# DOCX->PDF conversion (LibreOffice, or Word on Windows) reproduces the
+# template exactly. DSO_PDF_ENGINE=direct draws the PDF with fpdf2 instead,
+# skipping the DOCX round-trip; hosts with neither converter always do.
+if os.environ.get('DSO_PDF_ENGINE', '').lower() == 'direct':
+    PDF_BACKEND = 'direct'
+elif LIBREOFFICE_BIN:
+    PDF_BACKEND = 'libreoffice'
+elif IS_WINDOWS:
+    PDF_BACKEND = 'windows'
+else:
+    PDF_BACKEND = 'direct'
+
+# Size chart placeholders; '%s' is D for the dewasa chart and A for anak
+_SIZE_CHART_MAP = (
+    # Pendek
+    ('{{A%s}}', 'pendek_xs'),
+    ('{{B%s}}', 'pendek_s'),
+    ('{{C%s}}', 'pendek_m'),
+    ('{{D%s}}', 'pendek_l'),
+    ('{{E%s}}', 'pendek_xl'),
+    ('{{F%s}}', 'pendek_xxl'),
+    ('{{G%s}}', 'pendek_x3l'),
+    ('{{H%s_PENDEK}}', 'pendek_x4l'),
+    ('{{I%s_PENDEK}}', 'pendek_x5l'),
+    # Panjang
+    ('{{H%s}}', 'panjang_xs'),
+    ('{{I%s}}', 'panjang_s'),
+    ('{{J%s}}', 'panjang_m'),
+    ('{{K%s}}', 'panjang_l'),
+    ('{{L%s}}', 'panjang_xl'),
+    ('{{M%s}}', 'panjang_xxl'),
+    ('{{N%s}}', 'panjang_x3l'),
+    ('{{O%s}}', 'panjang_x4l'),
+    # Totals
+    ('{{JUM%sA}}', 'jum_pendek'),
+    ('{{JUM%sB}}', 'jum_panjang'),
+    ('{{QTY%s }}', 'total'),
+    ('{{QTY%s}}', 'total'),
+)
+_DEWASA_MAP = tuple((key % 'D', attr) for key, attr in _SIZE_CHART_MAP)
+_ANAK_MAP = tuple((key % 'A', attr) for key, attr in _SIZE_CHART_MAP)
+_SIZE_CHART_ATTRS = tuple(dict.fromkeys(attr for _, attr in _SIZE_CHART_MAP))
+
+# Replacements for a DSO without that size chart
+_DEWASA_ZEROS = {key: '0' for key, _ in _DEWASA_MAP}
+_ANAK_ZEROS = {key: '0' for key, _ in _ANAK_MAP}
+
+# Background pool for fetching DSO images while the document is being filled
+_IMAGE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix='dso-image')
+
+# Failures that leave the DSO image out instead of failing the export:
+# download errors, unreadable static files and broken image data
+_IMAGE_ERRORS = (
+    httpx.HTTPError, OSError,
+    InvalidImageStreamError, UnexpectedEndOfFileError, UnrecognizedImageError,
+)
+
+# Package members already compressed by their own format; deflating them
+# again costs time for no gain (embedded fonts do shrink, so they are not here)
+STORED_EXTENSIONS = frozenset(('png', 'jpg', 'jpeg', 'gif', 'emf', 'wmf'))
+
+# Longest side, in pixels, of an embedded DSO image (4 inches at 300 dpi)
+IMAGE_MAX_PIXELS = 1200
+
+# Recently downloaded DSO images, url -> (etag, last_modified, bytes), LRU order.
+# Held per worker process; DSO_IMAGE_CACHE_MB=0 turns the cache off.
+IMAGE_CACHE_MAX_ITEMS = 256
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('DSO_IMAGE_CACHE_MB', 16)) * 1024 * 1024
+_IMAGE_CACHE = OrderedDict()
+_IMAGE_CACHE_LOCK = threading.Lock()
+_image_cache_bytes = 0
+
+# Image downloads give up on unreachable hosts quickly; a URL that failed
+# at the transport level is not retried for IMAGE_FAILURE_TTL seconds
+IMAGE_FETCH_TIMEOUT = httpx.Timeout(10.0, connect=2.0)
+IMAGE_FAILURE_TTL = 60
+_IMAGE_FAILURES = {}
+
+# Rendered .docx / PDF exports, _output_key -> bytes, LRU order. Re-downloads
+# of an unchanged DSO skip filling, saving and converting entirely.
+# Held per worker process; DSO_OUTPUT_CACHE_MB=0 turns the cache off.
+OUTPUT_CACHE_MAX_ITEMS = 64
+OUTPUT_CACHE_MAX_BYTES = int(os.environ.get('DSO_OUTPUT_CACHE_MB', 16)) * 1024 * 1024
+_OUTPUT_CACHE = OrderedDict()
+_OUTPUT_CACHE_LOCK = threading.Lock()
+_output_cache_bytes = 0
+
+
+def _template_mtime(template_path):
+    """Modification time keying the template caches; raises if missing."""
+    try:
+        return os.stat(template_path).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Template not found: {template_path}")
+
+
+# The caches below are keyed by (path, mtime), so replacing a template on
+# disk takes effect on the next export without restarting the app.
+@lru_cache(maxsize=4)
+def _read_template(template_path, mtime):
+    """Read a .docx template once per version; exports parse it from memory."""
+    with open(template_path, 'rb') as f:
+        return f.read()
+
+
+@lru_cache(maxsize=4)
+def _template_document(template_path, mtime):
+    """Parse a template once per version.
+    
+    The cached Document is never modified; exports work on a deep copy,
+    which is about twice as fast as unzipping and parsing the bytes again.
+    """
+    return Document(io.BytesIO(_read_template(template_path, mtime)))
+
+
+@lru_cache(maxsize=4)
+def _template_placeholders(template_path, mtime):
+    """Placeholders a template contains, read once per version.
+    
+    Scans paragraph text rather than single runs so placeholders that Word
+    split across runs are found too.
+    """
+    doc = _template_document(template_path, mtime)
+    text = '\n'.join(p.text for p in doc.element.body.iter(qn('w:p')))
+    return frozenset(PLACEHOLDER_RE.findall(text))
+
+
+def _substitute_run(r, t, repl):
+    """Substitute placeholders in run r, whose text node t holds '{{'.
+    
+    A run holding only that one text node is rewritten in place; anything
+    else (tabs, breaks, empty results) goes through python-docx's Run.text,
+    which rebuilds the run content. Returns the run's new text.
+    """
+    if len(r) == (1 if r.rPr is None else 2):
+        text = PLACEHOLDER_RE.sub(repl, t.text)
+        if text == t.text:
+            # Only unknown placeholders (e.g. {{GAMBAR}}); nothing to write
+            return text
+        if text and not RUN_BREAK_RE.search(text):
+            t.text = text
+            # Same rule python-docx applies when it creates a w:t
+            if len(text.strip()) < len(text):
+                t.set(XML_SPACE, 'preserve')
+            else:
+                t.attrib.pop(XML_SPACE, None)
+            return text
+    run = Run(r, None)
+    old_text = run.text
+    text = PLACEHOLDER_RE.sub(repl, old_text)
+    if text != old_text:
+        run.text = text
+    return text
+
+
+def _fetch_image(url):
+    """Download an image over the shared keep-alive client.
+    
+    Images seen before are revalidated with a conditional GET and served
+    from the cache on 304. The body is only read for a 200 response;
+    returns None otherwise. Files kept by the local upload fallback
+    (/static/... URLs) are read from disk. Large images come back
+    downscaled to the size they are printed at.
+    """
+    if url.startswith('/static/'):
+        content = _read_static_file(url)
+        return _downscale_image(content) if content is not None else None
+    
+    with _IMAGE_CACHE_LOCK:
+        cached = _IMAGE_CACHE.get(url)
+        failed_until = _IMAGE_FAILURES.get(url)
+    
+    # Don't wait on a host that just failed again (e.g. one URL shared by
+    # every DSO of a bulk export)
+    if failed_until is not None and failed_until > time.monotonic():
+        raise httpx.TransportError(f"Image host recently unreachable: {url}")
+    
+    headers = {}
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+    
+    try:
+        with http_client.stream('GET', url, headers=headers, timeout=IMAGE_FETCH_TIMEOUT) as response:
+            if response.status_code == 304 and cached:
+                with _IMAGE_CACHE_LOCK:
+                    if url in _IMAGE_CACHE:
+                        _IMAGE_CACHE.move_to_end(url)
+                return cached[2]
+            if response.status_code != 200:
+                return None
+            # Copy the body chunk by chunk into a single growing buffer
+            buffer = io.BytesIO()
+            for chunk in response.iter_bytes(64 * 1024):
+                buffer.write(chunk)
+            content = _downscale_image(buffer.getvalue())
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+    except httpx.TransportError:
+        now = time.monotonic()
+        with _IMAGE_CACHE_LOCK:
+            for expired in [u for u, until in _IMAGE_FAILURES.items() if until <= now]:
+                del _IMAGE_FAILURES[expired]
+            _IMAGE_FAILURES[url] = now + IMAGE_FAILURE_TTL
+        raise
+    
+    # Without a validator the copy could never be revalidated, so skip it
+    if (etag or last_modified) and len(content) <= IMAGE_CACHE_MAX_BYTES:
+        _cache_image(url, (etag, last_modified, content))
+    return content
+
+
+def _downscale_image(content):
+    """Shrink an image to IMAGE_MAX_PIXELS on its longest side.
+    
+    The DSO prints the image 4 inches wide, so anything beyond ~300 dpi
+    only inflates the .docx and slows down the PDF conversion. JPEGs stay
+    JPEG (keeping their EXIF, so orientation is unchanged) and everything
+    else becomes PNG. Small or unreadable images are returned untouched.
+    """
+    try:
+        with Image.open(io.BytesIO(content)) as img:
+            if max(img.size) <= IMAGE_MAX_PIXELS:
+                return content
+            is_jpeg = img.format == 'JPEG'
+            exif = img.info.get('exif', b'')
+            img.thumbnail((IMAGE_MAX_PIXELS, IMAGE_MAX_PIXELS), Image.LANCZOS)
+            buffer = io.BytesIO()
+            if is_jpeg:
+                if img.mode not in ('L', 'RGB', 'CMYK'):
+                    img = img.convert('RGB')
+                img.save(buffer, 'JPEG', quality=85, optimize=True, exif=exif)
+            else:
+                img.save(buffer, 'PNG', optimize=True)
+            return buffer.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return content
+
+
+def _read_static_file(url):
+    """Read a /static/... file from the app's static folder; None if missing."""
+    path = os.path.normpath(os.path.join(STATIC_DIR, url[len('/static/'):]))
+    if not path.startswith(STATIC_DIR + os.sep) or not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _cache_image(url, entry):
+    """Store an image, evicting least recently used ones beyond the limits."""
+    global _image_cache_bytes
+    with _IMAGE_CACHE_LOCK:
+        old = _IMAGE_CACHE.pop(url, None)
+        if old:
+            _image_cache_bytes -= len(old[2])
+        _IMAGE_CACHE[url] = entry
+        _image_cache_bytes += len(entry[2])
+        while (len(_IMAGE_CACHE) > IMAGE_CACHE_MAX_ITEMS
+               or _image_cache_bytes > IMAGE_CACHE_MAX_BYTES):
+            _, evicted = _IMAGE_CACHE.popitem(last=False)
+            _image_cache_bytes -= len(evicted[2])
+
+
+def _merge_split_runs(paragraph, repl):
+    """Merge the runs each placeholder straddles into its first run, then substitute."""
+    runs = paragraph.runs
+    texts = [run.text for run in runs]
+    ends = list(accumulate(len(text) for text in texts))
+    
+    # Index ranges of runs to merge; placeholders sharing a run join one range
+    groups = []
+    for match in PLACEHOLDER_RE.finditer(''.join(texts)):
+        first = bisect_right(ends, match.start())
+        last = bisect_right(ends, match.end() - 1)
+        if first == last:
+            continue
+        if groups and first <= groups[-1][1]:
+            groups[-1][1] = max(groups[-1][1], last)
+        else:
+            groups.append([first, last])
+    
+    for first, last in reversed(groups):
+        runs[first].text = PLACEHOLDER_RE.sub(repl, ''.join(texts[first:last + 1]))
+        for run in runs[first + 1:last + 1]:
+            run._r.getparent().remove(run._r)
+
+
+@lru_cache(maxsize=256)
+def _cached_qr_png(order_code):
+    """PNG bytes of an order's invoice QR code; raises if generation failed.
+    
+    Cached because re-exports of the same order (new DSO versions, bulk
+    exports) need the identical image. Failures raise so that lru_cache
+    does not remember them.
+    """
+    qr_buffer = generate_qr_code(order_code, size=6)
+    if qr_buffer is None:
+        raise ValueError(f"QR code generation failed for {order_code}")
+    return qr_buffer.getvalue()
+
+
+def _qr_png(order_code):
+    """PNG bytes of an order's invoice QR code; None if generation failed."""
+    try:
+        return _cached_qr_png(order_code)
+    except ValueError:
+        return None
+
+
+class _FastZipPkgWriter:
+    """python-docx physical package writer tuned for throughput.
+    
+    XML parts are deflated at level 1 (about half the save time of the
+    default level for a few percent more bytes) and images are stored as-is.
+    """
+    
+    def __init__(self, pkg_file):
+        self._zipf = zipfile.ZipFile(pkg_file, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+    
+    def write(self, pack_uri, blob):
+        if pack_uri.ext.lower() in STORED_EXTENSIONS:
+            self._zipf.writestr(pack_uri.membername, blob, compress_type=zipfile.ZIP_STORED)
+        else:
+            self._zipf.writestr(pack_uri.membername, blob)
+    
+    def close(self):
+        self._zipf.close()
+
+
+# save_document relies on python-docx internals (checked against 1.1); if a
+# later release moves them, exports fall back to the regular doc.save()
+try:
+    from docx.opc.pkgwriter import PackageWriter
+except ImportError:
+    PackageWriter = None
+FAST_SAVE_SUPPORTED = PackageWriter is not None and hasattr(Part, 'before_marshal') and all(
+    hasattr(PackageWriter, name)
+    for name in ('_write_content_types_stream', '_write_pkg_rels', '_write_parts')
+)
+
+
+def save_document(doc, pkg_file):
+    """Save a Document like doc.save(pkg_file), using the faster zip writer.
+    
+    Mirrors OpcPackage.save / PackageWriter.write (python-docx 1.1) with the
+    physical writer swapped out.
+    """
+    if not FAST_SAVE_SUPPORTED:
+        doc.save(pkg_file)
+        return
+    package = doc.part.package
+    parts = list(package.parts)
+    for part in parts:
+        part.before_marshal()
+    phys_writer = _FastZipPkgWriter(pkg_file)
+    try:
+        PackageWriter._write_content_types_stream(phys_writer, parts)
+        PackageWriter._write_pkg_rels(phys_writer, package.rels)
+        PackageWriter._write_parts(phys_writer, parts)
+    finally:
+        phys_writer.close()
+
+
+def _read_into_buffer(path):
+    """Copy a file into a BytesIO in 1 MiB blocks and rewind it."""
+    buffer = io.BytesIO()
+    with open(path, 'rb') as f:
+        shutil.copyfileobj(f, buffer, length=1 << 20)
+    buffer.seek(0)
+    return buffer
 
 
 def export_dso_to_word(dso, use_libre_template=False):
@@ -16,29 +492,32 @@ def export_dso_to_word(dso, use_libre_template=False):
         use_libre_template: If True, use LibreOffice-optimized template (for PDF export)
                            If False, use MS Word template (for .docx download)
     """
-    if use_libre_template:
-        template_name = 'dsotemplates_libre.docx'
-    else:
-        template_name = 'dsotemplates.docx'
+    # Serve an unchanged DSO from the render cache
+    replacements = _template_replacements(dso, use_libre_template)
+    key = _output_key(dso, use_libre_template, 'docx', replacements)
+    data = _cached_output(key)
+    if data is not None:
+        return io.BytesIO(data)
     
-    template_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                                  '..', 'template_docs', template_name)
+    doc, complete = _build_dso_document(dso, use_libre_template, replacements)
     
-    if not os.path.exists(template_path):
-        # Fallback to original template if libre version doesn't exist
-        template_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                                      '..', 'template_docs', 'dsotemplates.docx')
-    
-    if not os.path.exists(template_path):
-        raise FileNotFoundError(f"Template not found: {template_path}")
+    # Save to BytesIO buffer
+    buffer = io.BytesIO()
+    save_document(doc, buffer)
+    buffer.seek(0)
     
-    # Load template
-    doc = Document(template_path)
+    if complete:
+        _cache_output(key, buffer.getvalue())
+    return buffer
+
+
+def _dso_replacements(dso, placeholders):
+    """Map each template placeholder to its text for this DSO.
     
-    # Prepare data mappings
+    placeholders is the set the template actually uses; values that would
+    need extra work are only computed when the template has a slot for them.
+    """
     order = dso.order
-    dewasa = dso.size_chart_dewasa
-    anak = dso.size_chart_anak
     
     # Build replacement dictionary
     replacements = {
@@ -73,274 +552,459 @@ def export_dso_to_word(dso, use_libre_template=False):
         '{{CATATAN CUSTOMER 5}}': dso.catatan_customer_5 or '',
         '{{CATATAN CUSTOMER 6}}': dso.catatan_customer_6 or '',
         '{{LABEL}}': dso.label or '',
-        
-        # Customer Info (for QC Sheet page)
-        '{{CUSTOMER}}': order.customer.name if order.customer else '',
-        
-        # Size Chart Dewasa - Pendek
-        '{{AD}}': str(dewasa.pendek_xs if dewasa else 0),
-        '{{BD}}': str(dewasa.pendek_s if dewasa else 0),
-        '{{CD}}': str(dewasa.pendek_m if dewasa else 0),
-        '{{DD}}': str(dewasa.pendek_l if dewasa else 0),
-        '{{ED}}': str(dewasa.pendek_xl if dewasa else 0),
-        '{{FD}}': str(dewasa.pendek_xxl if dewasa else 0),
-        '{{GD}}': str(dewasa.pendek_x3l if dewasa else 0),
-        '{{HD_PENDEK}}': str(dewasa.pendek_x4l if dewasa else 0),
-        '{{ID_PENDEK}}': str(dewasa.pendek_x5l if dewasa else 0),
-        
-        # Size Chart Dewasa - Panjang
-        '{{HD}}': str(dewasa.panjang_xs if dewasa else 0),
-        '{{ID}}': str(dewasa.panjang_s if dewasa else 0),
-        '{{JD}}': str(dewasa.panjang_m if dewasa else 0),
-        '{{KD}}': str(dewasa.panjang_l if dewasa else 0),
-        '{{LD}}': str(dewasa.panjang_xl if dewasa else 0),
-        '{{MD}}': str(dewasa.panjang_xxl if dewasa else 0),
-        '{{ND}}': str(dewasa.panjang_x3l if dewasa else 0),
-        '{{OD}}': str(dewasa.panjang_x4l if dewasa else 0),
-        
-        # Dewasa totals
-        '{{JUMDA}}': str(dewasa.jum_pendek if dewasa else 0),
-        '{{JUMDB}}': str(dewasa.jum_panjang if dewasa else 0),
-        '{{QTYD }}': str(dewasa.total if dewasa else 0),
-        '{{QTYD}}': str(dewasa.total if dewasa else 0),
-        
-        # Size Chart Anak - Pendek
-        '{{AA}}': str(anak.pendek_xs if anak else 0),
-        '{{BA}}': str(anak.pendek_s if anak else 0),
-        '{{CA}}': str(anak.pendek_m if anak else 0),
-        '{{DA}}': str(anak.pendek_l if anak else 0),
-        '{{EA}}': str(anak.pendek_xl if anak else 0),
-        '{{FA}}': str(anak.pendek_xxl if anak else 0),
-        '{{GA}}': str(anak.pendek_x3l if anak else 0),
-        '{{HA_PENDEK}}': str(anak.pendek_x4l if anak else 0),
-        '{{IA_PENDEK}}': str(anak.pendek_x5l if anak else 0),
-        
-        # Size Chart Anak - Panjang
-        '{{HA}}': str(anak.panjang_xs if anak else 0),
-        '{{IA}}': str(anak.panjang_s if anak else 0),
-        '{{JA}}': str(anak.panjang_m if anak else 0),
-        '{{KA}}': str(anak.panjang_l if anak else 0),
-        '{{LA}}': str(anak.panjang_xl if anak else 0),
-        '{{MA}}': str(anak.panjang_xxl if anak else 0),
-        '{{NA}}': str(anak.panjang_x3l if anak else 0),
-        '{{OA}}': str(anak.panjang_x4l if anak else 0),
-        
-        # Anak totals
-        '{{JUMAA}}': str(anak.jum_pendek if anak else 0),
-        '{{JUMAB}}': str(anak.jum_panjang if anak else 0),
-        '{{QTYA }}': str(anak.total if anak else 0),
-        '{{QTYA}}': str(anak.total if anak else 0),
     }
     
-    # Replace text in all tables
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for key, value in replacements.items():
-                    if key in cell.text:
-                        # Replace while preserving formatting
-                        for paragraph in cell.paragraphs:
-                            for run in paragraph.runs:
-                                if key in run.text:
-                                    run.text = run.text.replace(key, value)
-                            # Also check full paragraph text if runs don't have it
-                            if key in paragraph.text:
-                                paragraph.text = paragraph.text.replace(key, value)
-    
-    # Replace in paragraphs outside tables
-    for paragraph in doc.paragraphs:
-        for key, value in replacements.items():
-            if key in paragraph.text:
-                for run in paragraph.runs:
-                    if key in run.text:
-                        run.text = run.text.replace(key, value)
+    # Values below need another query; skip them if the template has no slot
+    if '{{CUSTOMER}}' in placeholders:
+        # Customer Info (for QC Sheet page)
+        replacements['{{CUSTOMER}}'] = order.customer.name if order.customer else ''
     
-    # Handle image placeholder {{GAMBAR}}
+    # Size charts; each field is read once (total sums every other field)
+    # and a missing chart reads as all zeros
+    for relation, fields, zeros in (('size_chart_dewasa', _DEWASA_MAP, _DEWASA_ZEROS),
+                                    ('size_chart_anak', _ANAK_MAP, _ANAK_ZEROS)):
+        if placeholders.isdisjoint(zeros):
+            continue
+        chart = getattr(dso, relation)
+        if chart is None:
+            replacements.update(zeros)
+        else:
+            values = {attr: str(getattr(chart, attr)) for attr in _SIZE_CHART_ATTRS}
+            replacements.update((key, values[attr]) for key, attr in fields)
+    return replacements
+
+
+def _template_replacements(dso, use_libre_template):
+    """_dso_replacements for the placeholders of the chosen template."""
+    template_path = LIBRE_TEMPLATE_PATH if use_libre_template else WORD_TEMPLATE_PATH
+    return _dso_replacements(dso, _template_placeholders(template_path, _template_mtime(template_path)))
+
+
+def _output_key(dso, use_libre_template, kind, replacements):
+    """Cache key for a rendered export: everything the output depends on.
+    
+    The filled-in text (replacements from _template_replacements, which
+    cover the DSO, its order, customer and size charts), the template
+    version and the image URL; uploads never reuse a file name, so the URL
+    identifies the image content.
+    """
+    template_path = LIBRE_TEMPLATE_PATH if use_libre_template else WORD_TEMPLATE_PATH
+    return (kind, template_path, _template_mtime(template_path), dso.gambar_depan_url,
+            frozenset(replacements.items()))
+
+
+def _cached_output(key):
+    """Rendered export bytes for key, or None."""
+    with _OUTPUT_CACHE_LOCK:
+        data = _OUTPUT_CACHE.get(key)
+        if data is not None:
+            _OUTPUT_CACHE.move_to_end(key)
+        return data
+
+
+def _cache_output(key, data):
+    """Store a rendered export, evicting least recently used ones beyond the limits."""
+    global _output_cache_bytes
+    if len(data) > OUTPUT_CACHE_MAX_BYTES:
+        return
+    with _OUTPUT_CACHE_LOCK:
+        old = _OUTPUT_CACHE.pop(key, None)
+        if old is not None:
+            _output_cache_bytes -= len(old)
+        _OUTPUT_CACHE[key] = data
+        _output_cache_bytes += len(data)
+        while (len(_OUTPUT_CACHE) > OUTPUT_CACHE_MAX_ITEMS
+               or _output_cache_bytes > OUTPUT_CACHE_MAX_BYTES):
+            _, evicted = _OUTPUT_CACHE.popitem(last=False)
+            _output_cache_bytes -= len(evicted)
+
+
+def build_dso_document(dso, use_libre_template=False):
+    """Fill the DSO template and return the python-docx Document.
+    
+    Lets callers save straight to their destination (e.g. the PDF
+    converter's input file) without an intermediate buffer.
+    """
+    doc, _ = _build_dso_document(dso, use_libre_template)
+    return doc
+
+
+def _build_dso_document(dso, use_libre_template=False, replacements=None):
+    """build_dso_document plus whether the result may be cached.
+    
+    A document whose image or QR code could not be added is not complete;
+    the next export should try again rather than reuse it. replacements may
+    be passed in when the caller already computed them for the cache key.
+    """
+    complete = True
+    
+    # Start the image download now so it overlaps with template filling
+    image_future = None
     if dso.gambar_depan_url:
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if '{{GAMBAR}}' in cell.text:
-                        # Clear the cell
-                        for paragraph in cell.paragraphs:
-                            paragraph.clear()
-                        
-                        # Try to add image
-                        try:
-                            # Download image from URL
-                            response = requests.get(dso.gambar_depan_url, timeout=10)
-                            if response.status_code == 200:
-                                image_stream = io.BytesIO(response.content)
-                                # Add image to cell
-                                paragraph = cell.paragraphs[0] if cell.paragraphs else cell.add_paragraph()
-                                run = paragraph.add_run()
-                                run.add_picture(image_stream, width=Inches(4))
-                                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                        except Exception as e:
-                            print(f"Error adding image: {e}")
-                            cell.paragraphs[0].add_run("(Gambar tidak tersedia)")
-    else:
-        # Remove placeholder if no image
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if '{{GAMBAR}}' in cell.text:
-                        for paragraph in cell.paragraphs:
-                            paragraph.text = paragraph.text.replace('{{GAMBAR}}', '')
+        image_future = _IMAGE_EXECUTOR.submit(_fetch_image, dso.gambar_depan_url)
     
-    # Handle QR Invoice placeholder {{QRINV}}
-    if order.order_code:
-        qr_buffer = generate_qr_code(order.order_code, size=6)
-        if qr_buffer:
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if '{{QRINV}}' in cell.text:
-                            # Clear the cell
-                            for paragraph in cell.paragraphs:
-                                paragraph.clear()
-                            
-                            # Add QR code image
-                            try:
-                                paragraph = cell.paragraphs[0] if cell.paragraphs else cell.add_paragraph()
-                                run = paragraph.add_run()
-                                run.add_picture(qr_buffer, width=Inches(0.65))
-                                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                            except Exception as e:
-                                print(f"Error adding QR code: {e}")
-                                cell.paragraphs[0].add_run("(QR tidak tersedia)")
+    template_path = LIBRE_TEMPLATE_PATH if use_libre_template else WORD_TEMPLATE_PATH
+    
+    mtime = _template_mtime(template_path)
+    
+    # Prepare data mappings
+    order = dso.order
+    placeholders = _template_placeholders(template_path, mtime)
+    
+    # Render the invoice QR code in the background as well
+    qr_future = None
+    if order.order_code and '{{QRINV}}' in placeholders:
+        qr_future = _IMAGE_EXECUTOR.submit(_qr_png, order.order_code)
+    
+    # Work on a copy of the pre-parsed template (no unzip/parse per export)
+    doc = copy.deepcopy(_template_document(template_path, mtime))
+    
+    if replacements is None:
+        replacements = _dso_replacements(dso, placeholders)
     else:
-        # Remove placeholder if no order code
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if '{{QRINV}}' in cell.text:
-                        for paragraph in cell.paragraphs:
-                            paragraph.text = paragraph.text.replace('{{QRINV}}', '')
+        # The caller's dict backs its cache key; keep it unchanged
+        replacements = dict(replacements)
     
-    # Save to BytesIO buffer
-    buffer = io.BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
+    # Without an image / order code the image placeholders simply vanish
+    # in the text pass below
+    if image_future is None:
+        replacements['{{GAMBAR}}'] = ''
+    if not order.order_code:
+        replacements['{{QRINV}}'] = ''
     
-    return buffer
+    # Unknown placeholders (e.g. {{GAMBAR}}, {{QRINV}}) are left as-is
+    def repl(match):
+        return replacements.get(match.group(0), match.group(0))
+    
+    # Replace text in a single pass over every text node in the body
+    # (table cells and free paragraphs alike). The node list is snapshotted
+    # because rewriting a run replaces its w:t children.
+    split_paragraphs = []
+    for t in list(doc.element.body.iter(qn('w:t'))):
+        text = t.text
+        if not text or '{' not in text and '}' not in text:
+            continue
+        r = t.getparent()
+        if '{{' in text:
+            # Replace while preserving formatting
+            text = _substitute_run(r, t, repl)
+            if '{' not in text and '}' not in text:
+                continue
+        # Leftover braces may be half of a placeholder split across runs
+        p = next(r.iterancestors(qn('w:p')), None)
+        if p is not None and (not split_paragraphs or split_paragraphs[-1] is not p):
+            split_paragraphs.append(p)
+    
+    # Also check full paragraph text if runs don't have it. Every paragraph
+    # still holding {{GAMBAR}} / {{QRINV}} passes through here as well, so
+    # their cells are collected now instead of re-walking all tables later.
+    image_cells = {'{{GAMBAR}}': [], '{{QRINV}}': []}
+    for p in split_paragraphs:
+        paragraph = Paragraph(p, None)
+        text = paragraph.text
+        if '{{' in text and PLACEHOLDER_RE.sub(repl, text) != text:
+            # A placeholder straddles runs; merge them so the value keeps
+            # the formatting of the run the placeholder starts in
+            _merge_split_runs(paragraph, repl)
+            text = paragraph.text
+            new_text = PLACEHOLDER_RE.sub(repl, text)
+            if new_text != text:
+                # Still split (e.g. across a hyperlink): flatten the paragraph
+                paragraph.text = text = new_text
+        for token, cells in image_cells.items():
+            if token in text:
+                tc = next(p.iterancestors(qn('w:tc')), None)
+                if tc is not None and tc not in cells:
+                    cells.append(tc)
+    gambar_cells = [_Cell(tc, doc._body) for tc in image_cells['{{GAMBAR}}']]
+    qrinv_cells = [_Cell(tc, doc._body) for tc in image_cells['{{QRINV}}']]
+    
+    # Handle image placeholder {{GAMBAR}}
+    if image_future is not None:
+        for cell in gambar_cells:
+            # Clear the cell
+            for paragraph in cell.paragraphs:
+                paragraph.clear()
+            
+            # Try to add image
+            try:
+                # Wait for the download started at the top
+                image_bytes = image_future.result()
+                if image_bytes is None:
+                    complete = False
+                else:
+                    # BytesIO shares the bytes object until written to; no copy
+                    image_stream = io.BytesIO(image_bytes)
+                    # Add image to cell
+                    paragraph = cell.paragraphs[0] if cell.paragraphs else cell.add_paragraph()
+                    run = paragraph.add_run()
+                    run.add_picture(image_stream, width=Inches(4))
+                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            except _IMAGE_ERRORS:
+                logger.exception("Error adding image for DSO %s", dso.id)
+                complete = False
+                cell.paragraphs[0].add_run("(Gambar tidak tersedia)")
+    
+    # Handle QR Invoice placeholder {{QRINV}}
+    if qrinv_cells:
+        qr_png = qr_future.result() if qr_future is not None else _qr_png(order.order_code)
+        complete = complete and qr_png is not None
+        if qr_png:
+            for cell in qrinv_cells:
+                # Clear the cell
+                for paragraph in cell.paragraphs:
+                    paragraph.clear()
+                
+                # Add QR code image
+                try:
+                    paragraph = cell.paragraphs[0] if cell.paragraphs else cell.add_paragraph()
+                    run = paragraph.add_run()
+                    run.add_picture(io.BytesIO(qr_png), width=Inches(0.65))
+                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                except Exception:
+                    logger.exception("Error adding QR code for DSO %s", dso.id)
+                    complete = False
+                    cell.paragraphs[0].add_run("(QR tidak tersedia)")
+    
+    return doc, complete
 
 
 def export_dso_to_pdf(dso):
     """Export DSO data to PDF document.
     
-    On Windows: uses docx2pdf for Word-to-PDF conversion (best fidelity).
-    On Linux: uses WeasyPrint to generate PDF from HTML (Railway compatible).
+    Uses headless LibreOffice wherever it is installed (Railway compatible).
+    Windows machines without LibreOffice fall back to Word via pywin32;
+    anywhere else (or with DSO_PDF_ENGINE=direct) the PDF is drawn with fpdf2.
     """
-    import sys
-    import platform
-    
-    # Check if we're on Windows
-    is_windows = platform.system() == 'Windows'
+    pdf_path = export_dso_to_pdf_file(dso)
+    try:
+        return _read_into_buffer(pdf_path)
+    finally:
+        shutil.rmtree(os.path.dirname(pdf_path), ignore_errors=True)
+
+
+def export_dso_to_pdf_file(dso):
+    """Export DSO data to a PDF file on disk and return its path.
     
-    if is_windows:
-        return _export_dso_to_pdf_windows(dso)
-    else:
-        return _export_dso_to_pdf_weasyprint(dso)
+    The file lives in its own temp directory; the caller must remove
+    os.path.dirname(path) once the file has been sent.
+    """
+    tmpdir = tempfile.mkdtemp(prefix='dso-pdf-', dir=FAST_TMP_DIR)
+    try:
+        if PDF_BACKEND == 'direct':
+            return _export_dso_to_pdf_direct(dso, tmpdir)
+        
+        # Serve an unchanged DSO from the render cache
+        use_libre_template = PDF_BACKEND == 'libreoffice'
+        replacements = _template_replacements(dso, use_libre_template)
+        key = _output_key(dso, use_libre_template, 'pdf', replacements)
+        data = _cached_output(key)
+        if data is not None:
+            pdf_path = os.path.join(tmpdir, 'dso.pdf')
+            with open(pdf_path, 'wb') as f:
+                f.write(data)
+            return pdf_path
+        
+        if PDF_BACKEND == 'libreoffice':
+            pdf_path, complete = _export_dso_to_pdf_libreoffice(dso, tmpdir, replacements)
+        else:
+            pdf_path, complete = _export_dso_to_pdf_windows(dso, tmpdir, replacements)
+        if complete and OUTPUT_CACHE_MAX_BYTES:
+            with open(pdf_path, 'rb') as f:
+                _cache_output(key, f.read())
+        return pdf_path
+    except Exception:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        raise
 
 
-def _export_dso_to_pdf_windows(dso):
-    """Export DSO to PDF using docx2pdf (Windows only)."""
-    import tempfile
-    import site
-    import os
+def _export_dso_to_pdf_direct(dso, tmpdir):
+    """Export DSO to PDF in tmpdir with fpdf2, without going through Word."""
+    from .pdf_service import generate_dso_pdf
+    
+    image_bytes = None
+    if dso.gambar_depan_url:
+        try:
+            image_bytes = _fetch_image(dso.gambar_depan_url)
+        except _IMAGE_ERRORS:
+            logger.exception("Error fetching image for DSO %s", dso.id)
+    qr_png = _qr_png(dso.order.order_code) if dso.order.order_code else None
+    
+    result = generate_dso_pdf(dso, image_bytes, qr_png)
+    if not result['success']:
+        raise Exception(f"PDF generation failed: {result['error']}")
+    
+    pdf_path = os.path.join(tmpdir, 'dso.pdf')
+    with open(pdf_path, 'wb') as f:
+        f.write(result['pdf'])
+    return pdf_path
 
-    # Fix for pywin32 DLL load error (pywintypes314.dll not found)
-    try:
-        import sys
-        paths_to_check = sys.path + site.getsitepackages()
-        for path in paths_to_check:
-            dll_path = os.path.join(path, 'pywin32_system32')
-            if os.path.exists(dll_path):
-                os.environ['PATH'] = dll_path + os.pathsep + os.environ['PATH']
-                break
-    except Exception as e:
-        print(f"Warning: Could not patch PATH for pywin32: {e}")
 
-    try:
-        from docx2pdf import convert
-        import pythoncom
-    except ImportError as e:
-        raise ImportError(f"PDF generation requires docx2pdf and pywin32. Error: {e}")
+def _export_dso_to_pdf_windows(dso, tmpdir, replacements=None):
+    """Export DSO to PDF in tmpdir through Microsoft Word (Windows only).
     
-    word_buffer = export_dso_to_word(dso)
+    Conversion runs on word_com_worker's long-lived Word instance, which
+    raises ImportError when pywin32 is missing.
+    Returns (pdf_path, complete) as in _build_dso_document.
+    """
+    from .word_com_worker import convert
     
-    with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as tmp_docx:
-        tmp_docx.write(word_buffer.getvalue())
-        tmp_docx_path = tmp_docx.name
+    tmp_docx_path = os.path.join(tmpdir, 'dso.docx')
+    tmp_pdf_path = os.path.join(tmpdir, 'dso.pdf')
     
-    tmp_pdf_path = tmp_docx_path.replace('.docx', '.pdf')
+    doc, complete = _build_dso_document(dso, replacements=replacements)
+    save_document(doc, tmp_docx_path)
     
-    try:
-        pythoncom.CoInitialize()
-        convert(tmp_docx_path, tmp_pdf_path)
-        
-        with open(tmp_pdf_path, 'rb') as f:
-            pdf_content = f.read()
-            
-        pdf_buffer = io.BytesIO(pdf_content)
-        return pdf_buffer
-        
-    finally:
-        if os.path.exists(tmp_docx_path):
-            os.remove(tmp_docx_path)
-        if os.path.exists(tmp_pdf_path):
-            os.remove(tmp_pdf_path)
+    # Conversion runs on the long-lived Word instance owned by the worker
+    convert(tmp_docx_path, tmp_pdf_path)
+    
+    os.remove(tmp_docx_path)
+    return tmp_pdf_path, complete
 
 
-def _export_dso_to_pdf_weasyprint(dso):
-    """Export DSO to PDF using LibreOffice (Linux compatible).
+def _export_dso_to_pdf_libreoffice(dso, tmpdir, replacements=None):
+    """Export DSO to PDF in tmpdir using LibreOffice.
     
     Uses the LibreOffice-optimized template for better PDF output.
+    Returns (pdf_path, complete) as in _build_dso_document.
+    """
+    # Write the Word document, filled from the LibreOffice-optimized
+    # template, straight to the converter's input file
+    docx_path = os.path.join(tmpdir, 'dso.docx')
+    doc, complete = _build_dso_document(dso, use_libre_template=True, replacements=replacements)
+    save_document(doc, docx_path)
+    
+    pdf_path, = convert_docx_to_pdf([docx_path], tmpdir)
+    os.remove(docx_path)
+    return pdf_path, complete
+
+
+def convert_docx_to_pdf(docx_paths, outdir, timeout=60):
+    """Convert .docx files to PDFs in outdir with headless LibreOffice.
+    
+    Uses the persistent UNO-driven office when LibreOffice's Python bindings
+    are installed; otherwise one soffice run converts all the files, so
+    passing several lets them share a single start-up.
+    Returns the PDF paths in the same order as docx_paths.
     """
-    import tempfile
     import subprocess
-    import os
     
-    # Generate the Word document using the LibreOffice-optimized template
-    word_buffer = export_dso_to_word(dso, use_libre_template=True)
+    if not LIBREOFFICE_BIN:
+        raise Exception("PDF conversion failed. Please install LibreOffice: sudo pacman -S libreoffice-fresh")
     
-    # Create temp directory for conversion
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Save Word file
-        docx_path = os.path.join(tmpdir, 'dso.docx')
-        pdf_path = os.path.join(tmpdir, 'dso.pdf')
-        
-        with open(docx_path, 'wb') as f:
-            f.write(word_buffer.getvalue())
-        
-        # Convert using LibreOffice headless
-        lo_commands = ['libreoffice', 'soffice']
-        converted = False
-        
-        for lo_cmd in lo_commands:
+    pdf_paths = [
+        os.path.join(outdir, os.path.splitext(os.path.basename(path))[0] + '.pdf')
+        for path in docx_paths
+    ]
+    
+    # Prefer the long-running office over paying a start-up per call
+    if libreoffice_worker.available():
+        try:
+            for docx_path, pdf_path in zip(docx_paths, pdf_paths):
+                libreoffice_worker.convert(LIBREOFFICE_BIN, docx_path, pdf_path)
+            return pdf_paths
+        except Exception:
+            logger.exception("LibreOffice UNO conversion failed, falling back to soffice --convert-to")
+    
+    result = subprocess.run([
+        LIBREOFFICE_BIN,
+        *LIBREOFFICE_ARGS,
+        '--outdir', outdir,
+        *docx_paths
+    ], capture_output=True, text=True, timeout=timeout)
+    
+    if result.returncode != 0 or not all(os.path.exists(path) for path in pdf_paths):
+        raise Exception(f"PDF conversion failed: {result.stderr.strip() or 'no output produced'}")
+    return pdf_paths
+
+
+def _preload_dso(dso):
+    """Load the relationships an export reads while still on the request thread.
+    
+    Worker threads then only read already-loaded attributes and never touch
+    the (thread-unsafe) session.
+    """
+    order = dso.order
+    order.customer
+    dso.size_chart_dewasa
+    dso.size_chart_anak
+
+
+def export_dso_batch(dso_list, export_format='word', max_workers=8):
+    """Export several DSOs concurrently.
+    
+    Documents are filled on a thread pool so image downloads and template
+    work overlap. For PDFs all documents go through a single LibreOffice
+    run instead of one start-up per DSO.
+    
+    Returns a list aligned with dso_list holding a BytesIO per DSO, or the
+    exception raised while exporting that DSO.
+    """
+    if not dso_list:
+        return []
+    for dso in dso_list:
+        _preload_dso(dso)
+    workers = min(max_workers, len(dso_list))
+    
+    if export_format != 'pdf':
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dso-export') as pool:
+            futures = [pool.submit(export_dso_to_word, dso) for dso in dso_list]
+        return [future.exception() or future.result() for future in futures]
+    
+    if PDF_BACKEND == 'direct':
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dso-export') as pool:
+            futures = [pool.submit(export_dso_to_pdf, dso) for dso in dso_list]
+        return [future.exception() or future.result() for future in futures]
+    
+    if PDF_BACKEND == 'windows':
+        # The Word COM fallback converts one document at a time anyway
+        results = []
+        for dso in dso_list:
             try:
-                result = subprocess.run([
-                    lo_cmd,
-                    '--headless',
-                    '--convert-to', 'pdf',
-                    '--outdir', tmpdir,
-                    docx_path
-                ], capture_output=True, text=True, timeout=60)
-                
-                if result.returncode == 0 and os.path.exists(pdf_path):
-                    converted = True
-                    break
-            except FileNotFoundError:
-                continue
+                results.append(export_dso_to_pdf(dso))
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    # Unchanged DSOs come straight from the render cache
+    replacements = [_template_replacements(dso, True) for dso in dso_list]
+    keys = [_output_key(dso, True, 'pdf', reps) for dso, reps in zip(dso_list, replacements)]
+    results = [None] * len(dso_list)
+    for i, key in enumerate(keys):
+        data = _cached_output(key)
+        if data is not None:
+            results[i] = io.BytesIO(data)
+    missing = [i for i, result in enumerate(results) if result is None]
+    if not missing:
+        return results
+    
+    tmpdir = tempfile.mkdtemp(prefix='dso-pdf-', dir=FAST_TMP_DIR)
+    try:
+        def save_docx(index):
+            docx_path = os.path.join(tmpdir, f'dso_{index}.docx')
+            doc, complete = _build_dso_document(dso_list[index], use_libre_template=True,
+                                                replacements=replacements[index])
+            save_document(doc, docx_path)
+            return docx_path, complete
         
-        if not converted:
-            raise Exception("PDF conversion failed. Please install LibreOffice: sudo pacman -S libreoffice-fresh")
+        with ThreadPoolExecutor(max_workers=min(workers, len(missing)), thread_name_prefix='dso-export') as pool:
+            futures = {i: pool.submit(save_docx, i) for i in missing}
+        for i, future in futures.items():
+            results[i] = future.exception()
         
-        # Read the generated PDF
-        with open(pdf_path, 'rb') as f:
-            pdf_content = f.read()
-    
-    pdf_buffer = io.BytesIO(pdf_content)
-    return pdf_buffer
-
+        pending = [i for i in missing if results[i] is None]
+        if pending:
+            docx_paths = [futures[i].result()[0] for i in pending]
+            try:
+                pdf_paths = convert_docx_to_pdf(docx_paths, tmpdir, timeout=60 + 10 * len(docx_paths))
+            except Exception as e:
+                for i in pending:
+                    results[i] = e
+            else:
+                for i, pdf_path in zip(pending, pdf_paths):
+                    results[i] = _read_into_buffer(pdf_path)
+                    if futures[i].result()[1]:
+                        _cache_output(keys[i], results[i].getvalue())
+        return results
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
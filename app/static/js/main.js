@@ -126,6 +126,32 @@ function showToast(message, type = 'info') {
     }, 3000);
 }
 
+// DSO PDF export: queue the conversion, poll until the file is ready, then download it
+async function exportDsoPdf(dsoId) {
+    showLoading('Membuat PDF...');
+    try {
+        let job = (await api.post(`/dso/${dsoId}/export-pdf/jobs`, null, false)).data;
+        while (job.status === 'pending') {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            const response = await fetch(job.status_url, { credentials: 'same-origin' });
+            const result = await response.json();
+            if (!response.ok) {
+                throw new Error(result.message || 'Export failed');
+            }
+            job = result.data;
+        }
+        if (job.status === 'done') {
+            window.location.href = job.download_url;
+        } else {
+            showToast(job.error || 'Export failed', 'error');
+        }
+    } catch (error) {
+        showToast(error.message, 'error');
+    } finally {
+        hideLoading();
+    }
+}
+
 // Modal Functions
 function openModal(modalId) {
     const modal = document.getElementById(modalId);
@@ -1,42 +1,107 @@
 """Utility decorators for RBAC and logging."""
+import atexit
+import queue
+import threading
+from datetime import datetime
 from functools import wraps
-from flask import request, jsonify, g
+from flask import request, jsonify, g, current_app
 from flask_login import current_user
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from sqlalchemy import tuple_
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_current_user
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 from ..models.user import UserRole
 from ..models.audit import ActivityLog
 from ..extensions import db
 
+# Activity log rows waiting to be written, as plain dicts (no ORM objects
+# cross threads). A background writer inserts them in batches so requests
+# don't wait on an INSERT + COMMIT of their own.
+LOG_BATCH_SIZE = 500
+_log_queue = queue.Queue()
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+
+def _write_logs(app, batch):
+    """Insert a batch of activity log rows in one transaction."""
+    with app.app_context():
+        try:
+            db.session.bulk_insert_mappings(ActivityLog, batch)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Activity logging error: {e}")
+
+
+def _drain_logs(first=None):
+    """Collect whatever is queued (up to LOG_BATCH_SIZE rows) without waiting."""
+    batch = [first] if first is not None else []
+    while len(batch) < LOG_BATCH_SIZE:
+        try:
+            batch.append(_log_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _run_log_writer(app):
+    """Writer loop: block for one row, then write it with everything queued since."""
+    while True:
+        _write_logs(app, _drain_logs(_log_queue.get()))
+
+
+def _enqueue_log(entry):
+    """Queue an activity log row, starting the writer on first use."""
+    global _log_writer
+    if _log_writer is None:
+        with _log_writer_lock:
+            if _log_writer is None:
+                app = current_app._get_current_object()
+                _log_writer = threading.Thread(target=_run_log_writer, args=(app,),
+                                               name='activity-log-writer', daemon=True)
+                _log_writer.start()
+                atexit.register(_flush_logs, app)
+    _log_queue.put_nowait(entry)
+
+
+def _flush_logs(app):
+    """Write rows still queued at shutdown."""
+    batch = _drain_logs()
+    while batch:
+        _write_logs(app, batch)
+        batch = _drain_logs()
+
 
 def require_roles(*roles):
     """Decorator to require specific user roles."""
+    # Convert roles to string values once; user.role is a string
+    role_values = [role.value if hasattr(role, 'value') else role for role in roles]
+    allowed_role_values = frozenset(role_values)
+    denied_message = f'Required roles: {role_values}'
+
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # Check if user is authenticated
-            if not current_user.is_authenticated:
+            # Session login first; otherwise an optional JWT, which returns
+            # without raising when no token was sent at all
+            if current_user.is_authenticated:
+                user = current_user
+            else:
                 try:
-                    verify_jwt_in_request()
-                except:
+                    verify_jwt_in_request(optional=True)
+                except (JWTExtendedException, PyJWTError):
+                    return jsonify({'error': 'Authentication required'}), 401
+                user = get_current_user() if get_jwt_identity() is not None else None
+                # Tokens outlive deactivation; refuse them like login does
+                if user is None or not user.is_active:
                     return jsonify({'error': 'Authentication required'}), 401
             
-            user = current_user if current_user.is_authenticated else None
-            if user is None:
-                return jsonify({'error': 'Authentication required'}), 401
-            
-            # Convert roles to string values for comparison
-            allowed_role_values = []
-            for role in roles:
-                if hasattr(role, 'value'):
-                    allowed_role_values.append(role.value)
-                else:
-                    allowed_role_values.append(role)
-            
-            # Check if user has required role (user.role is now a string)
+            # Check if user has required role
             if user.role not in allowed_role_values:
                 return jsonify({
                     'error': 'Access denied',
-                    'message': f'Required roles: {allowed_role_values}'
+                    'message': denied_message
                 }), 403
             
             return f(*args, **kwargs)
@@ -77,21 +142,24 @@ def log_activity(module, action):
             # Log the activity
             try:
                 user_id = current_user.id if current_user.is_authenticated else None
+                # Plain dict reads; the raw header avoids building a UserAgent
+                g_vars = vars(g)
+                environ = request.environ
                 
-                log = ActivityLog(
+                _enqueue_log(dict(
                     user_id=user_id,
                     module=module,
                     action=action,
-                    record_id=getattr(g, 'record_id', None),
-                    record_type=getattr(g, 'record_type', None),
-                    data_before=getattr(g, 'data_before', None),
-                    data_after=getattr(g, 'data_after', None),
-                    description=getattr(g, 'log_description', None),
-                    ip_address=request.remote_addr,
-                    user_agent=request.user_agent.string[:500] if request.user_agent else None
-                )
-                db.session.add(log)
-                db.session.commit()
+                    record_id=g_vars.get('record_id'),
+                    record_type=g_vars.get('record_type'),
+                    data_before=g_vars.get('data_before'),
+                    data_after=g_vars.get('data_after'),
+                    description=g_vars.get('log_description'),
+                    ip_address=environ.get('REMOTE_ADDR'),
+                    user_agent=environ.get('HTTP_USER_AGENT', '')[:500] or None,
+                    # Time of the action, not of the (later) batch insert
+                    timestamp=datetime.utcnow()
+                ))
             except Exception as e:
                 # Don't fail the request if logging fails
                 print(f"Activity logging error: {e}")
@@ -120,9 +188,33 @@ def api_response(data=None, message=None, status=200, errors=None):
     return jsonify(response), status
 
 
-def paginate_query(query, page=1, per_page=20, max_per_page=100):
-    """Paginate a SQLAlchemy query."""
+def paginate_query(query, page=1, per_page=20, max_per_page=100, keyset=None, after=None):
+    """Paginate a SQLAlchemy query.
+
+    keyset is a tuple of NOT NULL columns the caller orders the query by,
+    descending (last one unique, e.g. (Order.created_at, Order.id)). The page
+    is then the rows sorting after the ``after`` values taken from the previous
+    page's last row (None for the first page), so deep pages don't scan OFFSET
+    rows and no COUNT(*) is run; one extra row tells whether a next page
+    exists. The pagination dict carries ``next_after`` for the following request.
+    """
     per_page = min(per_page, max_per_page)
+
+    if keyset is not None:
+        if after is not None:
+            query = query.filter(tuple_(*keyset) < tuple_(*after))
+        rows = query.limit(per_page + 1).all()
+        items = rows[:per_page]
+        has_next = len(rows) > per_page
+        return {
+            'items': items,
+            'pagination': {
+                'per_page': per_page,
+                'has_next': has_next,
+                'next_after': tuple(getattr(items[-1], col.key) for col in keyset) if has_next else None
+            }
+        }
+
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     
     return {
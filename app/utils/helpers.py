@@ -1,26 +1,30 @@
 """Utility helpers."""
 import os
-import uuid
+import secrets
+import time
 from datetime import datetime
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
 from werkzeug.utils import secure_filename
 
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx'})
 
 
 def allowed_file(filename):
     """Check if file extension is allowed."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in ALLOWED_EXTENSIONS
 
 
 def generate_unique_filename(original_filename):
     """Generate a unique filename while preserving extension."""
-    ext = original_filename.rsplit('.', 1)[1].lower() if '.' in original_filename else ''
-    unique_id = uuid.uuid4().hex[:8]
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-    safe_name = secure_filename(original_filename.rsplit('.', 1)[0])[:20]
-    return f"{safe_name}_{timestamp}_{unique_id}.{ext}"
+    name, dot, ext = original_filename.rpartition('.')
+    if not dot:
+        name, ext = original_filename, ''
+    safe_name = secure_filename(name)[:20]
+    return f"{safe_name}_{time.time_ns()}_{secrets.token_hex(4)}.{ext.lower()}"
 
 
 def format_currency(value, currency='Rp'):
@@ -30,17 +34,25 @@ def format_currency(value, currency='Rp'):
     return f"{currency} {value:,.0f}".replace(',', '.')
 
 
-def format_datetime(dt, format='%d/%m/%Y %H:%M'):
-    """Format datetime for display."""
+def format_datetime(dt, format=None):
+    """Format datetime for display (default DD/MM/YYYY HH:MM)."""
     if dt is None:
         return '-'
+    if format is None:
+        if not isinstance(dt, datetime):
+            # Plain dates have no time fields; strftime renders them as 00:00
+            return dt.strftime('%d/%m/%Y %H:%M')
+        # Same output as strftime('%d/%m/%Y %H:%M') at about half the cost
+        return f"{dt.day:02d}/{dt.month:02d}/{dt.year} {dt.hour:02d}:{dt.minute:02d}"
     return dt.strftime(format)
 
 
-def format_date(dt, format='%d/%m/%Y'):
-    """Format date for display."""
+def format_date(dt, format=None):
+    """Format date for display (default DD/MM/YYYY)."""
     if dt is None:
         return '-'
+    if format is None:
+        return f"{dt.day:02d}/{dt.month:02d}/{dt.year}"
     return dt.strftime(format)
 
 
@@ -51,57 +63,117 @@ def calculate_percentage(value, total):
     return round((value / total) * 100, 2)
 
 
+# Markup kept by sanitize_html; everything else is dropped (text is kept)
+SANITIZE_ALLOWED_TAGS = frozenset({'b', 'i', 'em', 'strong', 'p', 'br', 'ul', 'ol', 'li', 'a'})
+SANITIZE_ALLOWED_ATTRS = {'a': frozenset({'href', 'title'})}
+SANITIZE_URL_SCHEMES = frozenset({'', 'http', 'https', 'mailto'})
+_VOID_TAGS = frozenset({'br'})
+_DROP_CONTENT_TAGS = frozenset({'script', 'style'})
+
+
+def _is_safe_url(url):
+    """Whether a link uses an allowed scheme; unparseable URLs are not."""
+    try:
+        return urlsplit(url).scheme.lower() in SANITIZE_URL_SCHEMES
+    except ValueError:
+        return False
+
+
+class _HTMLSanitizer(HTMLParser):
+    """Re-serializes allowlisted tags and attributes, escaping all text."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _DROP_CONTENT_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth or tag not in SANITIZE_ALLOWED_TAGS:
+            return
+        allowed = SANITIZE_ALLOWED_ATTRS.get(tag, ())
+        out = [tag]
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name == 'href' and not _is_safe_url(value):
+                continue
+            out.append(f'{name}="{escape(value)}"')
+        self.parts.append(f"<{' '.join(out)}>")
+
+    def handle_endtag(self, tag):
+        if tag in _DROP_CONTENT_TAGS:
+            self.skip_depth = max(self.skip_depth - 1, 0)
+            return
+        if self.skip_depth or tag not in SANITIZE_ALLOWED_TAGS or tag in _VOID_TAGS:
+            return
+        self.parts.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(escape(data, quote=False))
+
+
 def sanitize_html(text):
-    """Basic HTML sanitization."""
+    """Strip HTML down to a small allowlist of formatting tags.
+
+    Uses the standard library tokenizer, so run time stays linear in the
+    input; script/style content, comments, event handlers and
+    non-http(s)/mailto links are removed.
+    """
     if not text:
         return text
-    # Remove script tags
-    import re
-    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    # Remove on* attributes
-    text = re.sub(r'\s+on\w+\s*=\s*["\'][^"\']*["\']', '', text, flags=re.IGNORECASE)
-    return text
+    parser = _HTMLSanitizer()
+    parser.feed(text)
+    parser.close()
+    return ''.join(parser.parts)
+
+
+PRIORITY_LABELS = {
+    1: 'Normal',
+    2: 'High',
+    3: 'Urgent'
+}
+
+PRIORITY_COLORS = {
+    1: 'secondary',
+    2: 'warning',
+    3: 'danger'
+}
+
+STATUS_COLORS = {
+    'draft': 'secondary',
+    'pending': 'warning',
+    'pending_approval': 'info',
+    'pending_dso': 'info',
+    'approved': 'success',
+    'in_progress': 'primary',
+    'in_production': 'primary',
+    'qc_in_progress': 'info',
+    'qc_pending': 'warning',
+    'qc_failed': 'danger',
+    'completed': 'success',
+    'pass': 'success',
+    'fail': 'danger',
+    'rework': 'warning',
+    'cancelled': 'dark',
+    'rejected': 'danger',
+    'on_hold': 'secondary'
+}
 
 
 def get_priority_label(priority):
     """Get priority label from number."""
-    labels = {
-        1: 'Normal',
-        2: 'High',
-        3: 'Urgent'
-    }
-    return labels.get(priority, 'Normal')
+    return PRIORITY_LABELS.get(priority, 'Normal')
 
 
 def get_priority_color(priority):
     """Get priority color class."""
-    colors = {
-        1: 'secondary',
-        2: 'warning',
-        3: 'danger'
-    }
-    return colors.get(priority, 'secondary')
+    return PRIORITY_COLORS.get(priority, 'secondary')
 
 
 def get_status_color(status):
     """Get status color class."""
-    status_colors = {
-        'draft': 'secondary',
-        'pending': 'warning',
-        'pending_approval': 'info',
-        'pending_dso': 'info',
-        'approved': 'success',
-        'in_progress': 'primary',
-        'in_production': 'primary',
-        'qc_in_progress': 'info',
-        'qc_pending': 'warning',
-        'qc_failed': 'danger',
-        'completed': 'success',
-        'pass': 'success',
-        'fail': 'danger',
-        'rework': 'warning',
-        'cancelled': 'dark',
-        'rejected': 'danger',
-        'on_hold': 'secondary'
-    }
-    return status_colors.get(status, 'secondary')
+    return STATUS_COLORS.get(status, 'secondary')
@@ -2,21 +2,28 @@
 from wtforms.validators import ValidationError
 import re
 
+_PHONE_SEPARATORS = re.compile(r'[\s\-]')
+_PHONE_RE = re.compile(r'^(\+62|62|0)[0-9]{8,12}$')
+_ORDER_CODE_RE = re.compile(r'^ORD-\d{6}-\d{4}$')
+_UPPER_RE = re.compile(r'[A-Z]')
+_LOWER_RE = re.compile(r'[a-z]')
+_DIGIT_RE = re.compile(r'[0-9]')
+
 
 def validate_phone(form, field):
     """Validate Indonesian phone number."""
     if field.data:
         # Remove spaces and dashes
-        phone = re.sub(r'[\s\-]', '', field.data)
+        phone = _PHONE_SEPARATORS.sub('', field.data)
         # Check if it's a valid Indonesian phone number
-        if not re.match(r'^(\+62|62|0)[0-9]{8,12}$', phone):
+        if not _PHONE_RE.match(phone):
             raise ValidationError('Nomor telepon tidak valid.')
 
 
 def validate_order_code(form, field):
     """Validate order code format."""
     if field.data:
-        if not re.match(r'^ORD-\d{6}-\d{4}$', field.data):
+        if not _ORDER_CODE_RE.match(field.data):
             raise ValidationError('Format kode order tidak valid.')
 
 
@@ -31,9 +38,9 @@ def validate_password_strength(form, field):
     password = field.data
     if len(password) < 8:
         raise ValidationError('Password minimal 8 karakter.')
-    if not re.search(r'[A-Z]', password):
+    if not _UPPER_RE.search(password):
         raise ValidationError('Password harus mengandung huruf kapital.')
-    if not re.search(r'[a-z]', password):
+    if not _LOWER_RE.search(password):
         raise ValidationError('Password harus mengandung huruf kecil.')
-    if not re.search(r'[0-9]', password):
+    if not _DIGIT_RE.search(password):
         raise ValidationError('Password harus mengandung angka.')
@@ -1,4 +1,6 @@
 """Views blueprint for frontend pages."""
+import time
+
 from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify, send_from_directory
 from flask_login import login_required, current_user, login_user, logout_user
 from ..models.user import User, UserRole
@@ -12,20 +14,66 @@ from ..extensions import db
 
 views_bp = Blueprint('views', __name__)
 
+# Active customers for the order filter dropdowns as (id, name) rows, cached
+# per worker for ACTIVE_CUSTOMERS_TTL seconds and cleared by the customers API
+ACTIVE_CUSTOMERS_TTL = 60
+_active_customers_cache = {}
+
+
+def _active_customers():
+    """Active customers ordered by name, refreshed at most once per TTL."""
+    cached = _active_customers_cache.get('rows')
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    rows = db.session.query(Customer.id, Customer.name).filter(
+        Customer.is_active == True
+    ).order_by(Customer.name).all()
+    _active_customers_cache['rows'] = (time.monotonic() + ACTIVE_CUSTOMERS_TTL, rows)
+    return rows
+
+
+def invalidate_active_customers():
+    """Drop the cached dropdown list after a customer is added or changed."""
+    _active_customers_cache.clear()
+
+
+# Platforms poll /health every few seconds per replica; the database is
+# probed at most once per HEALTH_DB_TTL seconds and the result reused
+HEALTH_DB_TTL = 5
+_health_db = {'checked_at': None, 'status': None}
+
+
+def _ping_database():
+    """Run SELECT 1 on a pooled DBAPI connection, bypassing the ORM session."""
+    try:
+        conn = db.engine.raw_connection()
+    except Exception as e:
+        return f'error: {str(e)[:50]}'
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+        cursor.close()
+        return 'connected'
+    except Exception as e:
+        return f'error: {str(e)[:50]}'
+    finally:
+        # Returns the connection to the pool
+        conn.close()
+
 
 @views_bp.route('/health')
 def health_check():
     """Health check endpoint for Railway/deployment platforms."""
-    try:
-        # Try a simple DB query
-        db.session.execute(db.text('SELECT 1'))
-        db_status = 'connected'
-    except Exception as e:
-        db_status = f'error: {str(e)[:50]}'
+    now = time.monotonic()
+    checked_at = _health_db['checked_at']
+    if checked_at is None or now - checked_at > HEALTH_DB_TTL:
+        _health_db['status'] = _ping_database()
+        _health_db['checked_at'] = now
     
     return jsonify({
         'status': 'ok',
-        'database': db_status
+        'database': _health_db['status']
     }), 200
 
 
@@ -63,11 +111,9 @@ def login():
             email = request.form.get('email')
             password = request.form.get('password')
             
-            user = User.query.filter(
-                (User.email == email) | (User.username == email)
-            ).first()
+            user = User.authenticate(email, password)
             
-            if user and user.check_password(password) and user.is_active:
+            if user and user.is_active:
                 login_user(user)
                 next_page = request.args.get('next')
                 return redirect(next_page or url_for('views.dashboard'))
@@ -90,32 +136,65 @@ def logout():
     return redirect(url_for('views.login'))
 
 
-@views_bp.route('/dashboard')
-@login_required
-def dashboard():
-    """Main dashboard."""
-    from datetime import datetime, timedelta
-    from ..models.material import MaterialRequest
+# Dashboard counters and quality score are the same for every user; they are
+# recomputed at most once per DASHBOARD_STATS_TTL seconds per worker
+DASHBOARD_STATS_TTL = 30
+_dashboard_stats_cache = {}
+
 
+def _dashboard_stats():
+    """Dashboard stat cards, cached for DASHBOARD_STATS_TTL seconds."""
+    from sqlalchemy import case, exists, func, select
+    from ..models.material import MaterialRequest
     from ..models.qc import QCSheet
+    from ..services.qc_analytics import QCAnalyticsService
     
-    # Get stats
-    total_orders = Order.query.count()
-    active_orders = Order.query.filter(Order.status.in_(['in_production', 'qc_pending'])).count()
-    
-    # Pending QC - count production tasks that need QC inspection
+    cached = _dashboard_stats_cache.get('stats')
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    
+    # Get stats: order counts via conditional aggregates, the other tables
+    # as scalar subqueries, all in a single round-trip
+    (total_orders, active_orders, total_customers, total_employees,
+     pending_materials) = db.session.query(
+        func.count(Order.id),
+        func.count(case((Order.status.in_(['in_production', 'qc_pending']), 1))),
+        select(func.count(Customer.id)).scalar_subquery(),
+        select(func.count(Employee.id)).where(Employee.is_active == True).scalar_subquery(),
+        # Pending material requests - use correct status values
+        select(func.count(MaterialRequest.id)).where(
+            MaterialRequest.status.in_(['requested', 'in_transit', 'arrived', 'qc_pending'])
+        ).scalar_subquery(),
+    ).one()
+    
+    # Pending QC - count production tasks that need QC inspection, i.e.
+    # have no QC sheet yet (an anti-join on the production_task_id index)
     pending_qc_tasks = ProductionTask.query.filter(
-        ProductionTask.status.in_(['in_progress', 'completed'])
-    ).outerjoin(QCSheet).filter(QCSheet.id == None).count()
+        ProductionTask.status.in_(['in_progress', 'completed']),
+        ~exists().where(QCSheet.production_task_id == ProductionTask.id)
+    ).count()
     
-    # Additional stats
-    total_customers = Customer.query.count()
-    total_employees = Employee.query.filter_by(is_active=True).count()
+    # Calculate Quality Score from QC Analytics Service
+    quality_data = QCAnalyticsService.calculate_quality_score()
     
-    # Pending material requests - use correct status values
-    pending_materials = MaterialRequest.query.filter(
-        MaterialRequest.status.in_(['requested', 'in_transit', 'arrived', 'qc_pending'])
-    ).count()
+    stats = {
+        'total_orders': total_orders,
+        'active_orders': active_orders,
+        'pending_qc': pending_qc_tasks,
+        'total_customers': total_customers,
+        'total_employees': total_employees,
+        'pending_materials': pending_materials,
+        'quality_score': quality_data['quality_score'],
+    }
+    _dashboard_stats_cache['stats'] = (time.monotonic() + DASHBOARD_STATS_TTL, stats)
+    return stats
+
+
+@views_bp.route('/dashboard')
+@login_required
+def dashboard():
+    """Main dashboard."""
+    from datetime import datetime, timedelta
     
     # Recent orders
     recent_orders = Order.query.order_by(Order.created_at.desc()).limit(5).all()
@@ -128,45 +207,51 @@ def dashboard():
     ).distinct().order_by(Order.deadline.asc().nullslast()).limit(5).all()
     
     # Calculate production progress for each order
+    progress = _production_progress([o.id for o in production_orders])
     for order in production_orders:
-        total_tasks = order.production_tasks.count()
-        completed_tasks = order.production_tasks.filter(
-            ProductionTask.status == 'completed'
-        ).count()
-        order.progress = int((completed_tasks / total_tasks * 100)) if total_tasks > 0 else 0
-    
-
-    
-    # Calculate Quality Score from QC Analytics Service
-    from ..services.qc_analytics import QCAnalyticsService
-    quality_data = QCAnalyticsService.calculate_quality_score()
-    quality_score = quality_data['quality_score']
+        order.progress = progress.get(order.id, 0)
     
     return render_template('dashboard/index.html',
-        total_orders=total_orders,
-        active_orders=active_orders,
-        pending_qc=pending_qc_tasks,
-        total_customers=total_customers,
-        total_employees=total_employees,
-        pending_materials=pending_materials,
         recent_orders=recent_orders,
         production_orders=production_orders,
-
         now=datetime.now().date(),
-        quality_score=quality_score
+        **_dashboard_stats()
     )
 
 
+def _production_progress(order_ids):
+    """Map order id to Order.get_production_progress() for many orders at once.
+
+    Task totals and completed counts come from one grouped query; orders
+    without tasks are left out (progress 0).
+    """
+    from sqlalchemy import case, func
+    
+    if not order_ids:
+        return {}
+    rows = db.session.query(
+        ProductionTask.order_id,
+        func.count(ProductionTask.id),
+        func.count(case((ProductionTask.status == 'completed', 1)))
+    ).filter(
+        ProductionTask.order_id.in_(order_ids)
+    ).group_by(ProductionTask.order_id)
+    return {order_id: int((completed / total) * 100) for order_id, total, completed in rows}
+
+
 @views_bp.route('/orders')
 @login_required
 def orders():
     """Orders list page."""
+    from sqlalchemy.orm import selectinload
+    
     page = request.args.get('page', 1, type=int)
     search = request.args.get('search', '')
     status = request.args.get('status', '')
     customer_id = request.args.get('customer_id', type=int)
     
-    query = Order.query
+    # Customers of the whole page in one extra query instead of one per row
+    query = Order.query.options(selectinload(Order.customer))
     
     if search:
         query = query.filter(
@@ -181,28 +266,54 @@ def orders():
         query = query.filter(Order.customer_id == customer_id)
     
     orders = query.order_by(Order.created_at.desc()).paginate(page=page, per_page=20)
-    customers = Customer.query.filter_by(is_active=True).all()
-    return render_template('orders/list.html', orders=orders, customers=customers)
+    customers = _active_customers()
+    
+    # Progress bars and DSO buttons for the whole page in two queries; the
+    # task and DSO relationships are dynamic, so they can't be eager-loaded
+    order_ids = [o.id for o in orders.items]
+    progress_by_order = _production_progress(order_ids)
+    orders_with_dso = set()
+    if order_ids:
+        orders_with_dso = {order_id for (order_id,) in db.session.query(DSO.order_id).filter(
+            DSO.order_id.in_(order_ids)
+        ).distinct()}
+    
+    return render_template('orders/list.html', orders=orders, customers=customers,
+                           progress_by_order=progress_by_order, orders_with_dso=orders_with_dso)
 
 
 @views_bp.route('/orders/<int:order_id>')
 @login_required
 def order_detail(order_id):
     """Order detail page by ID."""
-    order = Order.query.get_or_404(order_id)
-    dsos = order.dso.order_by(DSO.version.desc()).all()
-    tasks = order.production_tasks.order_by(ProductionTask.sequence).all()
-    return render_template('orders/detail.html', order=order, dsos=dsos, tasks=tasks)
+    from sqlalchemy.orm import joinedload
+    
+    order = Order.query.options(joinedload(Order.customer)).filter_by(id=order_id).first_or_404()
+    return _render_order_detail(order)
 
 
 @views_bp.route('/orders/<order_code>')
 @login_required
 def order_detail_by_code(order_code):
     """Order detail page by order code (human-readable URL)."""
-    order = Order.query.filter_by(order_code=order_code).first_or_404()
+    from sqlalchemy.orm import joinedload
+    
+    order = Order.query.options(joinedload(Order.customer)).filter_by(order_code=order_code).first_or_404()
+    return _render_order_detail(order)
+
+
+def _render_order_detail(order):
+    """Render the order detail page with the order's DSOs and tasks.
+    
+    The task list is loaded once and the progress is computed from it, rather
+    than get_production_progress() re-querying the tasks for every use.
+    """
     dsos = order.dso.order_by(DSO.version.desc()).all()
     tasks = order.production_tasks.order_by(ProductionTask.sequence).all()
-    return render_template('orders/detail.html', order=order, dsos=dsos, tasks=tasks)
+    completed = sum(1 for t in tasks if t.status == 'completed')
+    production_progress = int(completed / len(tasks) * 100) if tasks else 0
+    return render_template('orders/detail.html', order=order, dsos=dsos, tasks=tasks,
+                           production_progress=production_progress)
 
 
 @views_bp.route('/dso/<int:dso_id>')
@@ -231,23 +342,58 @@ def dso_management():
     # Get counts for each status
     from sqlalchemy import func
     
-    not_created_count = Order.query.filter_by(dso_status='not_created').count()
-    draft_count = Order.query.filter_by(dso_status='draft').count()
-    created_count = Order.query.filter_by(dso_status='created').count()
+    counts = dict(
+        db.session.query(Order.dso_status, func.count(Order.id))
+        .filter(Order.dso_status.in_(['not_created', 'draft', 'created']))
+        .group_by(Order.dso_status)
+        .all()
+    )
     
     return render_template('dso/management.html',
-        not_created_count=not_created_count,
-        draft_count=draft_count,
-        created_count=created_count
+        not_created_count=counts.get('not_created', 0),
+        draft_count=counts.get('draft', 0),
+        created_count=counts.get('created', 0)
     )
 
 
+# Orders per production timeline page
+PRODUCTION_PAGE_SIZE = 50
+
+
+def _production_cursor_filter(cursor):
+    """Filter for the timeline orders sorting after a cursor.
+
+    The cursor is '<status_rank>_<deadline iso or empty>_<id>' of the last
+    order shown, matching ORDER BY status_rank, deadline NULLS LAST, id.
+    Returns None for a malformed cursor.
+    """
+    from datetime import date
+    from sqlalchemy import and_, or_
+    
+    try:
+        rank, deadline, order_id = cursor.split('_')
+        rank, order_id = int(rank), int(order_id)
+        deadline = date.fromisoformat(deadline) if deadline else None
+    except ValueError:
+        return None
+    
+    if deadline is None:
+        # Orders without a deadline come last within their rank
+        same_rank = and_(Order.deadline.is_(None), Order.id > order_id)
+    else:
+        same_rank = or_(
+            Order.deadline > deadline,
+            Order.deadline.is_(None),
+            and_(Order.deadline == deadline, Order.id > order_id)
+        )
+    return or_(Order.status_rank > rank, and_(Order.status_rank == rank, same_rank))
+
+
 @views_bp.route('/production')
 @login_required
 def production():
     """Production timeline page."""
     from datetime import date
-    from sqlalchemy import case
     from sqlalchemy.orm import joinedload
     from ..models.production import ProductionTask, ProductionWorkerLog
     from ..models.qc import QCSheet
@@ -256,30 +402,31 @@ def production():
     # User can filter to see completed orders if needed
     show_completed = request.args.get('show_completed', 'false') == 'true'
     
-    # Rank statuses: in_production (1), qc_pending (2), draft (3), completed (4)
-    status_order = case(
-        {
-            'in_production': 1,
-            'qc_pending': 2,
-            'draft': 3,
-            'completed': 4
-        },
-        value=Order.status,
-        else_=5
-    )
-    
     # Filter statuses based on show_completed parameter
     if show_completed:
         status_filter = ['draft', 'in_production', 'qc_pending', 'completed']
     else:
         status_filter = ['draft', 'in_production', 'qc_pending']
     
-    # Load orders with customer - limit to 50 for faster loading
-    orders = Order.query.options(
+    # Load orders with customer a page at a time; ?after= continues from the
+    # previous page's last order by seeking on the sort key, not by OFFSET
+    query = Order.query.options(
         joinedload(Order.customer)
     ).filter(
         Order.status.in_(status_filter)
-    ).order_by(status_order, Order.deadline.asc()).limit(50).all()
+    )
+    cursor_filter = _production_cursor_filter(request.args.get('after', ''))
+    if cursor_filter is not None:
+        query = query.filter(cursor_filter)
+    orders = query.order_by(
+        Order.status_rank, Order.deadline.asc().nullslast(), Order.id
+    ).limit(PRODUCTION_PAGE_SIZE + 1).all()
+    
+    next_cursor = None
+    if len(orders) > PRODUCTION_PAGE_SIZE:
+        orders = orders[:PRODUCTION_PAGE_SIZE]
+        last = orders[-1]
+        next_cursor = f"{last.status_rank}_{last.deadline.isoformat() if last.deadline else ''}_{last.id}"
     
     # Pre-fetch all data in efficient separate queries
     order_ids = [o.id for o in orders]
@@ -327,7 +474,8 @@ def production():
     for order in orders:
         order._prefetched_tasks = tasks_by_order.get(order.id, [])
     
-    return render_template('production/timeline.html', orders=orders, now=date.today(), show_completed=show_completed)
+    return render_template('production/timeline.html', orders=orders, now=date.today(), show_completed=show_completed,
+                           next_cursor=next_cursor, is_first_page=cursor_filter is None)
 
 
 
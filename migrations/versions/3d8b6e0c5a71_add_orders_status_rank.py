@@ -0,0 +1,32 @@
+"""Add generated status_rank column to orders
+
+Revision ID: 3d8b6e0c5a71
+Revises: 7c2e9a4f1b3d
+Create Date: 2026-10-16 11:05:27.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d8b6e0c5a71'
+down_revision = '7c2e9a4f1b3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite can only ADD virtual generated columns; PostgreSQL only stored ones
+    persisted = op.get_bind().dialect.name != 'sqlite'
+    op.add_column('orders', sa.Column('status_rank', sa.SmallInteger(), sa.Computed(
+        "CASE status WHEN 'in_production' THEN 1 WHEN 'qc_pending' THEN 2 "
+        "WHEN 'draft' THEN 3 WHEN 'completed' THEN 4 ELSE 5 END",
+        persisted=persisted
+    )))
+    op.create_index('ix_orders_status_rank_deadline', 'orders', ['status_rank', 'deadline'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_orders_status_rank_deadline', table_name='orders')
+    op.drop_column('orders', 'status_rank')
@@ -0,0 +1,35 @@
+"""Add trigram indexes for order search
+
+Revision ID: 7c2e9a4f1b3d
+Revises: 1f78737bb7e8
+Create Date: 2026-10-16 09:12:40.512334
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2e9a4f1b3d'
+down_revision = '1f78737bb7e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The orders page searches with ILIKE '%term%', which a btree index
+    # cannot serve; pg_trgm GIN indexes can (PostgreSQL only)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_orders_order_code_trgm', 'orders', ['order_code'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'order_code': 'gin_trgm_ops'})
+    op.create_index('ix_orders_model_trgm', 'orders', ['model'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'model': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_orders_model_trgm', table_name='orders')
+    op.drop_index('ix_orders_order_code_trgm', table_name='orders')
@@ -0,0 +1,26 @@
+"""Index orders.dso_status
+
+Revision ID: 9f4a2d7e6b18
+Revises: 3d8b6e0c5a71
+Create Date: 2026-10-16 11:41:03.927516
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f4a2d7e6b18'
+down_revision = '3d8b6e0c5a71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_orders_dso_status'), ['dso_status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_dso_status'))
@@ -0,0 +1,36 @@
+"""Add indexes for the sorted list views
+
+Revision ID: b52e8f1a9c04
+Revises: 9f4a2d7e6b18
+Create Date: 2026-10-16 12:18:45.604129
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52e8f1a9c04'
+down_revision = '9f4a2d7e6b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'], unique=False)
+    op.create_index('ix_orders_customer_created_at', 'orders', ['customer_id', 'created_at'], unique=False)
+    op.create_index('ix_customers_active_name', 'customers', ['name'], unique=False,
+                    postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active'))
+    op.create_index('ix_employees_name', 'employees', ['name'], unique=False)
+    op.create_index('ix_users_created_at', 'users', ['created_at'], unique=False)
+    op.create_index('ix_sop_document_active_title', 'sop_document', ['title'], unique=False,
+                    postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active'))
+
+
+def downgrade():
+    op.drop_index('ix_sop_document_active_title', table_name='sop_document')
+    op.drop_index('ix_users_created_at', table_name='users')
+    op.drop_index('ix_employees_name', table_name='employees')
+    op.drop_index('ix_customers_active_name', table_name='customers')
+    op.drop_index('ix_orders_customer_created_at', table_name='orders')
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
@@ -0,0 +1,26 @@
+"""Index qc_sheet.production_task_id
+
+Revision ID: d07c3b9e2f45
+Revises: b52e8f1a9c04
+Create Date: 2026-10-16 13:02:11.470853
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd07c3b9e2f45'
+down_revision = 'b52e8f1a9c04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('qc_sheet', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_qc_sheet_production_task_id'), ['production_task_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('qc_sheet', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_qc_sheet_production_task_id'))
@@ -0,0 +1,32 @@
+"""Make orders.created_at NOT NULL
+
+Revision ID: e4a91c6d3b27
+Revises: d07c3b9e2f45
+Create Date: 2026-10-16 21:10:42.118306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a91c6d3b27'
+down_revision = 'd07c3b9e2f45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The order list pages by (created_at, id); rows without a timestamp
+    # would never match the cursor comparison, so give them one
+    op.execute(
+        "UPDATE orders SET created_at = COALESCE(updated_at, order_date, CURRENT_TIMESTAMP) "
+        "WHERE created_at IS NULL"
+    )
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
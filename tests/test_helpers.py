@@ -0,0 +1,34 @@
+"""Tests for app.utils.helpers."""
+from datetime import date, datetime
+
+from app.utils.helpers import format_datetime, sanitize_html
+
+
+def test_sanitize_html_removes_script_content():
+    assert sanitize_html('<p>a<script>alert(1)</script></p>') == '<p>a</p>'
+    assert sanitize_html('<script>never closed <p>x') == ''
+
+
+def test_sanitize_html_drops_event_handlers():
+    assert sanitize_html('<p onclick="x()">a</p>') == '<p>a</p>'
+    assert sanitize_html('a<img src=x onerror=alert(1)>') == 'a'
+
+
+def test_sanitize_html_drops_javascript_links():
+    assert sanitize_html('<a href="javascript:alert(1)" title="t">x</a>') == '<a title="t">x</a>'
+    assert sanitize_html('<a href=" java\tscript:1">z</a>') == '<a>z</a>'
+
+
+def test_sanitize_html_drops_unparseable_links():
+    assert sanitize_html('<a href="http://[">x</a>') == '<a>x</a>'
+
+
+def test_sanitize_html_keeps_safe_links_and_escapes_text():
+    assert sanitize_html('<a href="/o?a=1&b=2">y</a>') == '<a href="/o?a=1&amp;b=2">y</a>'
+    assert sanitize_html('a < b & c<br/>d') == 'a &lt; b &amp; c<br>d'
+
+
+def test_format_datetime_default_layout():
+    assert format_datetime(datetime(2026, 3, 4, 5, 6)) == '04/03/2026 05:06'
+    assert format_datetime(date(2026, 3, 4)) == '04/03/2026 00:00'
+    assert format_datetime(None) == '-'
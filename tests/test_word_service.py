@@ -0,0 +1,60 @@
+"""Tests for the DSO export render cache key in app.services.word_service."""
+from datetime import date
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models import Customer, DSO, Order
+from app.models.dso import DSOSizeChartAnak, DSOSizeChartDewasa
+from app.services import word_service
+
+
+@pytest.fixture
+def dso():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        customer = Customer(name='ACME')
+        db.session.add(customer)
+        db.session.flush()
+        order = Order(order_code='INV-202601-0001', customer_id=customer.id, model='Kaos',
+                      qty_total=10, deadline=date(2026, 1, 2))
+        db.session.add(order)
+        db.session.flush()
+        dso = DSO(order_id=order.id, version=1, jenis='Kaos', bahan='Cotton',
+                  gambar_depan_url='/static/uploads/a.png')
+        db.session.add(dso)
+        db.session.flush()
+        db.session.add_all([DSOSizeChartDewasa(dso_id=dso.id, pendek_m=3),
+                            DSOSizeChartAnak(dso_id=dso.id, panjang_xs=2)])
+        db.session.commit()
+        yield dso
+        db.session.remove()
+        db.drop_all()
+
+
+def _key(dso):
+    db.session.expire_all()
+    replacements = word_service._template_replacements(dso, False)
+    return word_service._output_key(dso, False, 'docx', replacements)
+
+
+def test_output_key_is_stable_for_unchanged_dso(dso):
+    assert _key(dso) == _key(dso)
+
+
+@pytest.mark.parametrize('edit', [
+    lambda dso: setattr(dso, 'bahan', 'Fleece'),
+    lambda dso: setattr(dso, 'gambar_depan_url', '/static/uploads/b.png'),
+    lambda dso: setattr(dso.order, 'model', 'Polo'),
+    lambda dso: setattr(dso.order, 'deadline', date(2026, 2, 1)),
+    lambda dso: setattr(dso.order.customer, 'name', 'Globex'),
+    lambda dso: setattr(dso.size_chart_dewasa, 'pendek_m', 4),
+    lambda dso: setattr(dso.size_chart_anak, 'panjang_xs', 0),
+], ids=['dso', 'image', 'order', 'deadline', 'customer', 'size_chart_dewasa', 'size_chart_anak'])
+def test_output_key_changes_with_export_inputs(dso, edit):
+    before = _key(dso)
+    edit(dso)
+    db.session.commit()
+    assert _key(dso) != before